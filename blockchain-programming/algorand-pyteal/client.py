@@ -4,16 +4,126 @@ Demonstrates how to interact with Algorand smart contracts using the Python SDK
 """
 
 import base64
+import copy
+import hashlib
 import json
-from algosdk import account, mnemonic, transaction, logic
+import os
+import tempfile
+from algosdk import account, mnemonic, transaction, logic, constants, error
 from algosdk.v2client import algod, indexer
-from algosdk.future.transaction import ApplicationCreateTxn, ApplicationCallTxn, OnComplete, StateSchema
+from algosdk.transaction import ApplicationCreateTxn, ApplicationCallTxn, OnComplete, StateSchema, assign_group_id
 import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib import parse
+
+try:
+    import requests
+except ImportError:  # Optional: falls back to one connection per request
+    requests = None
+
+# Compiled program bytes keyed by the sha256 of their TEAL source
+COMPILE_CACHE_DIR = os.path.expanduser("~/.algorand_compile_cache")
+
+# Pause between demo steps so the output can be read as it runs
+VERBOSE_DEMO = False
+
+# SDK internals KeepAliveAlgodClient.algod_request depends on
+KEEP_ALIVE_SUPPORTED = (
+    requests is not None
+    and all(hasattr(constants, name) for name in ("no_auth", "unversioned_paths", "algod_auth_header"))
+    and hasattr(algod, "api_version_path_prefix")
+)
+
+class KeepAliveAlgodClient(algod.AlgodClient):
+    """
+    AlgodClient that sends every request over one pooled HTTP session
+    
+    The stock client opens a new connection (and TLS handshake) for each
+    call. Reusing a requests.Session keeps the connection alive across
+    status, compile, submit and confirmation calls.
+    
+    algosdk builds and sends each request in one method with no transport
+    hook, so algod_request mirrors its header and path handling. That
+    relies on SDK internals, hence the version pin in requirements.txt;
+    KEEP_ALIVE_SUPPORTED is False if they are missing, and
+    setup_algorand_client then uses the stock client.
+    """
+    
+    def __init__(self, algod_token, algod_address, headers=None, pool_size=8):
+        super().__init__(algod_token, algod_address, headers)
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            max_retries=requests.adapters.Retry(total=3, backoff_factor=0.2, allowed_methods=["GET"])
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+    
+    def algod_request(self, method, requrl, params=None, data=None, headers=None, response_format="json"):
+        """Same request handling as AlgodClient, over the shared session"""
+        header = {"User-Agent": "py-algorand-sdk"}
+        if self.headers:
+            header.update(self.headers)
+        if headers:
+            header.update(headers)
+        if requrl not in constants.no_auth:
+            header.update({constants.algod_auth_header: self.algod_token})
+        if requrl not in constants.unversioned_paths:
+            requrl = algod.api_version_path_prefix + requrl
+        if params:
+            requrl = requrl + "?" + parse.urlencode(params)
+        
+        resp = self.session.request(method, self.algod_address + requrl, headers=header, data=data)
+        if resp.status_code >= 400:
+            try:
+                message = resp.json().get("message", resp.text)
+            except ValueError:
+                message = resp.text
+            raise error.AlgodHTTPError(message, resp.status_code)
+        
+        if response_format == "json":
+            return resp.json()
+        return resp.content
+
+
+class BlockCursor:
+    """
+    Tracks the latest committed round locally
+    
+    The round only moves forward through status_after_block, which returns
+    as soon as the next block is committed, so waiting for new blocks never
+    needs another status() call after the first one.
+    """
+    
+    def __init__(self, algod_client, start_round=None):
+        self.algod_client = algod_client
+        if start_round is None:
+            start_round = algod_client.status()['last-round']
+        self.round = start_round
+    
+    def next(self):
+        """Block until the round after the current one is committed"""
+        status = self.algod_client.status_after_block(self.round)
+        # Catch up in one step if the chain moved on while we were idle
+        self.round = max(self.round + 1, status.get('last-round', 0))
+        return self.round
+    
+    def advance_to(self, round_number):
+        """Move the cursor forward to a round known to be committed"""
+        self.round = max(self.round, round_number)
+
 
 class AlgorandCounterClient:
     """Client for interacting with the Algorand Counter smart contract"""
     
-    def __init__(self, algod_client, private_key=None, mnemonic_phrase=None):
+    # Method names as sent in the first application argument
+    _METHOD_INCREMENT = b"increment"
+    _METHOD_DECREMENT = b"decrement"
+    _METHOD_RESET = b"reset"
+    
+    def __init__(self, algod_client, private_key=None, mnemonic_phrase=None, initial_round=None,
+                 indexer_client=None):
         """
         Initialize the client
         
@@ -21,8 +131,11 @@ class AlgorandCounterClient:
             algod_client: Algorand client instance
             private_key: Account private key (optional)
             mnemonic_phrase: Account mnemonic (optional)
+            initial_round: Last round already known to the caller (optional)
+            indexer_client: Indexer client used for state reads (optional)
         """
         self.algod_client = algod_client
+        self.indexer_client = indexer_client
         
         if private_key:
             self.private_key = private_key
@@ -39,6 +152,22 @@ class AlgorandCounterClient:
             print("Save this mnemonic safely!")
         
         self.app_id = None
+        
+        # Latest round seen on chain and the cached suggested params
+        self._known_round = initial_round
+        self._sp_cache = None
+        self._sp_cache_time = 0.0
+        self._cursor = None
+        
+        # Last global state read or derived from confirmed deltas, the
+        # round it is valid for, and the round of this client's last write
+        self._global_state_cache = None
+        self._state_cache_round = -1
+        self._last_write_round = -1
+        
+        # Recently fetched balance and when it was fetched
+        self._balance_cache = None
+        self._balance_cache_time = 0.0
     
     def get_account_info(self):
         """Get account information"""
@@ -51,49 +180,206 @@ class AlgorandCounterClient:
             print(f"Error getting account info: {e}")
             return None
     
-    def wait_for_confirmation(self, txid):
-        """Wait for transaction confirmation"""
-        last_round = self.algod_client.status().get('last-round')
-        txinfo = self.algod_client.pending_transaction_info(txid)
+    def account_balance(self, ttl_seconds=5.0):
+        """
+        Get the account balance in microAlgos
+        
+        Only the amount is needed, so holdings and created assets/apps are
+        excluded from the response. The result is reused for ttl_seconds.
+        """
+        now = time.monotonic()
+        if self._balance_cache is not None and now - self._balance_cache_time < ttl_seconds:
+            return self._balance_cache
+        
+        try:
+            account_info = self.algod_client.account_info(self.address, exclude="all")
+        except Exception as e:
+            print(f"Error getting account balance: {e}")
+            return None
+        
+        self._balance_cache = account_info.get('amount', 0)
+        self._balance_cache_time = now
+        return self._balance_cache
+    
+    def wait_for_confirmation(self, txid, max_rounds=10, verbose=False):
+        """
+        Wait for transaction confirmation
+        
+        Args:
+            txid: Transaction ID to wait for
+            max_rounds: Number of rounds to wait before giving up
+            verbose: Print a line for every round waited
+        """
+        return self.wait_for_confirmations([txid], max_rounds, verbose)[txid]
+    
+    def wait_for_confirmations(self, txids, max_rounds=10, verbose=False, errors=None):
+        """
+        Wait until every transaction in txids is confirmed
+        
+        Blocks on status_after_block (a long-poll that returns as soon as the
+        next block is committed) instead of polling in a tight loop, and
+        re-checks only the transactions still pending after each block. The
+        block cursor is shared by all confirmations of this client.
+        
+        Args:
+            txids: Transaction IDs to wait for
+            max_rounds: Number of rounds to wait before giving up
+            verbose: Print a line for every round waited
+            errors: Dict to collect per-txid failures in instead of raising;
+                the other transactions keep being waited for (optional)
+        
+        Returns:
+            Dict mapping each confirmed txid to its transaction info
+        
+        Raises:
+            RuntimeError: A transaction was rejected by the transaction pool
+            TimeoutError: Not all transactions confirmed within max_rounds
+        """
+        if self._cursor is None:
+            self._cursor = BlockCursor(self.algod_client, self._known_round)
+        cursor = self._cursor
+        
+        # Count the blocks waited in this call; the shared cursor may be far
+        # behind the chain if the client sat idle, so its first step can jump
+        rounds_waited = 0
+        
+        pending = list(txids)
+        confirmed = {}
+        
+        while True:
+            still_pending = []
+            for txid in pending:
+                txinfo = self.algod_client.pending_transaction_info(txid)
+                
+                # A rejected transaction will never confirm, stop polling now
+                error = txinfo.get('pool-error')
+                if error:
+                    failure = RuntimeError(f"Transaction {txid} rejected by pool: {error}")
+                    if errors is None:
+                        raise failure
+                    errors[txid] = failure
+                    continue
+                
+                confirmed_round = txinfo.get('confirmed-round') or 0
+                if confirmed_round > 0:
+                    confirmed[txid] = txinfo
+                    cursor.advance_to(confirmed_round)
+                    self._last_write_round = max(self._last_write_round, confirmed_round)
+                    print(f"Transaction confirmed in round {confirmed_round}")
+                else:
+                    still_pending.append(txid)
+            
+            pending = still_pending
+            if not pending:
+                break
+            if rounds_waited >= max_rounds:
+                if errors is None:
+                    raise TimeoutError(f"Transactions {pending} not confirmed after {max_rounds} rounds")
+                for txid in pending:
+                    errors[txid] = TimeoutError(f"Transaction {txid} not confirmed after {max_rounds} rounds")
+                break
+            
+            if verbose:
+                print(f"Waiting for confirmation... (Round {cursor.round})")
+            cursor.next()
+            rounds_waited += 1
+        
+        self._known_round = cursor.round
+        return confirmed
+    
+    def _get_params(self, ttl_seconds=15):
+        """
+        Get suggested transaction parameters, reusing a recent fetch
+        
+        Fee and genesis fields don't change between nearby rounds, so a
+        cached copy is reused for up to ttl_seconds (about 5 rounds). The
+        age is wall-clock time: the known round only advances on this
+        client's confirmations, so an idle client would otherwise keep a
+        validity window that has already passed.
+        """
+        now = time.monotonic()
+        if self._sp_cache is not None and now - self._sp_cache_time < ttl_seconds:
+            params = copy.copy(self._sp_cache)
+            if self._known_round is not None and self._known_round > params.first:
+                params.first = self._known_round
+                params.last = self._known_round + 1000
+            return params
+        
+        params = self.algod_client.suggested_params()
+        self._sp_cache = params
+        self._sp_cache_time = now
+        if self._known_round is None or params.first > self._known_round:
+            self._known_round = params.first
+        return copy.copy(params)
+    
+    def _compiled_program(self, teal_source):
+        """
+        Compile TEAL source to program bytes, caching the result on disk
+        
+        The same TEAL source always compiles to the same bytes, so the
+        compile RPC is only made the first time a given source is seen.
+        """
+        source_hash = hashlib.sha256(teal_source.encode('utf-8')).hexdigest()
+        cache_path = os.path.join(COMPILE_CACHE_DIR, f"{source_hash}.bin")
+        
+        if os.path.exists(cache_path):
+            with open(cache_path, 'rb') as f:
+                return f.read()
+        
+        result = self.algod_client.compile(teal_source)
+        program = base64.b64decode(result['result'])
         
-        while not (txinfo.get('confirmed-round') and txinfo.get('confirmed-round') > 0):
-            print(f"Waiting for confirmation... (Round {last_round})")
-            last_round += 1
-            self.algod_client.status_after_block(last_round)
-            txinfo = self.algod_client.pending_transaction_info(txid)
+        # Write to a temp file and rename it into place, so a concurrent
+        # reader never sees a partially written cache entry
+        os.makedirs(COMPILE_CACHE_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=COMPILE_CACHE_DIR, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(program)
+            os.replace(tmp_path, cache_path)
+        finally:
+            # Only still there if the write or rename failed
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
         
-        print(f"Transaction confirmed in round {txinfo.get('confirmed-round')}")
-        return txinfo
+        return program
+    
+    def _program_bytes(self, program):
+        """Return program bytes as they are, compiling TEAL source first"""
+        if isinstance(program, (bytes, bytearray)):
+            return bytes(program)
+        return self._compiled_program(program)
     
     def create_app(self, approval_teal_code, clear_teal_code):
         """
         Create the counter application on Algorand
         
         Args:
-            approval_teal_code: Compiled approval program TEAL code
-            clear_teal_code: Compiled clear state program TEAL code
+            approval_teal_code: Approval program TEAL code, or its program bytes
+            clear_teal_code: Clear state program TEAL code, or its program bytes
         """
         try:
             print("Creating Algorand Counter Application...")
             
-            # Compile TEAL programs
-            approval_program = self.algod_client.compile(approval_teal_code)
-            clear_program = self.algod_client.compile(clear_teal_code)
+            # Compile TEAL programs (cached by source hash); program bytes
+            # from simple_counter.py --tok are deployed as they are
+            approval_program = self._program_bytes(approval_teal_code)
+            clear_program = self._program_bytes(clear_teal_code)
             
             # Define schema
             global_schema = StateSchema(num_ints=4, num_byte_slices=0)
             local_schema = StateSchema(num_ints=0, num_byte_slices=0)
             
             # Get transaction parameters
-            params = self.algod_client.suggested_params()
+            params = self._get_params()
             
             # Create application creation transaction
             create_txn = ApplicationCreateTxn(
                 sender=self.address,
                 sp=params,
                 on_complete=OnComplete.NoOpOC,
-                approval_program=base64.b64decode(approval_program['result']),
-                clear_program=base64.b64decode(clear_program['result']),
+                approval_program=approval_program,
+                clear_program=clear_program,
                 global_schema=global_schema,
                 local_schema=local_schema
             )
@@ -117,37 +403,30 @@ class AlgorandCounterClient:
             print(f"Error creating application: {e}")
             return None
     
-    def call_app(self, method, app_args=None):
+    def call_app(self, method_bytes, app_args=None):
         """
         Call a method on the deployed application
         
         Args:
-            method: Method name to call
+            method_bytes: Method name to call, already encoded as bytes
             app_args: Additional arguments for the method
         """
+        assert isinstance(method_bytes, (bytes, bytearray)), "method name must be bytes"
+        
         if not self.app_id:
             print("No application deployed. Create application first.")
             return None
         
+        method = method_bytes.decode('utf-8')
+        
         try:
             print(f"Calling method '{method}' on app {self.app_id}")
             
-            # Prepare arguments
-            call_args = [method.encode('utf-8')]
-            if app_args:
-                call_args.extend([arg.encode('utf-8') if isinstance(arg, str) else arg for arg in app_args])
-            
             # Get transaction parameters
-            params = self.algod_client.suggested_params()
+            params = self._get_params()
             
             # Create application call transaction
-            call_txn = ApplicationCallTxn(
-                sender=self.address,
-                sp=params,
-                index=self.app_id,
-                on_complete=OnComplete.NoOpOC,
-                app_args=call_args
-            )
+            call_txn = self._build_call_txn(method_bytes, app_args, params)
             
             # Sign and submit transaction
             signed_txn = call_txn.sign(self.private_key)
@@ -165,66 +444,314 @@ class AlgorandCounterClient:
             print(f"Error calling method '{method}': {e}")
             return None
     
-    def read_global_state(self):
-        """Read the global state of the application"""
+    def call_app_batch(self, methods_and_args):
+        """
+        Call several methods as a single atomic transaction group
+        
+        The group is signed and submitted in one request and confirms
+        atomically, so only one confirmation wait is needed.
+        
+        Args:
+            methods_and_args: List of (method_bytes, app_args) tuples
+        """
         if not self.app_id:
-            print("No application deployed.")
+            print("No application deployed. Create application first.")
             return None
         
+        methods = [method_bytes.decode('utf-8') for method_bytes, _ in methods_and_args]
+        
         try:
-            app_info = self.algod_client.application_info(self.app_id)
-            global_state = app_info['params']['global-state']
+            print(f"Calling methods {methods} on app {self.app_id} as one group")
             
-            print(f"\nGlobal State for App {self.app_id}:")
-            print("-" * 40)
+            # One set of parameters is shared by the whole group
+            params = self._get_params()
             
-            state_data = {}
-            for item in global_state:
-                key = base64.b64decode(item['key']).decode('utf-8')
-                
-                if item['value']['type'] == 1:  # byte slice
-                    value = base64.b64decode(item['value']['bytes']).decode('utf-8')
-                else:  # integer
-                    value = item['value']['uint']
-                
-                state_data[key] = value
-                print(f"   {key}: {value}")
+            # Identical calls would share a txid, so tag each with its position
+            txns = [
+                self._build_call_txn(method_bytes, app_args, params, note=str(i).encode())
+                for i, (method_bytes, app_args) in enumerate(methods_and_args)
+            ]
+            assign_group_id(txns)
+            
+            # Sign and submit the group
+            signed_txns = [txn.sign(self.private_key) for txn in txns]
+            self.algod_client.send_transactions(signed_txns)
+            
+            txid = signed_txns[0].get_txid()
+            print(f"Group transaction ID: {txid}")
+            
+            # The group confirms atomically, the first txid is enough
+            txinfo = self.wait_for_confirmation(txid)
+            
+            print(f"Methods {methods} executed successfully")
+            return txinfo
+            
+        except Exception as e:
+            print(f"Error calling methods {methods}: {e}")
+            return None
+    
+    def call_many(self, methods_and_args, max_workers=8):
+        """
+        Call several independent methods concurrently
+        
+        Unlike call_app_batch the calls are not grouped, so each succeeds or
+        fails on its own: a rejected or unconfirmed call doesn't stop the
+        others from being confirmed. Transactions are signed locally,
+        submitted in parallel and then confirmed together.
+        
+        Args:
+            methods_and_args: List of (method_bytes, app_args) tuples
+            max_workers: Maximum number of concurrent submissions
+        
+        Returns:
+            List in the order of methods_and_args holding each call's
+            confirmed transaction info, or the exception it failed with
+        """
+        if not self.app_id:
+            print("No application deployed. Create application first.")
+            return None
+        
+        methods = [method_bytes.decode('utf-8') for method_bytes, _ in methods_and_args]
+        
+        try:
+            print(f"Calling methods {methods} on app {self.app_id} concurrently")
+            
+            params = self._get_params()
+            
+            # Signing is CPU-only, so it stays on this thread
+            signed_txns = [
+                self._build_call_txn(method_bytes, app_args, params, note=str(i).encode()).sign(self.private_key)
+                for i, (method_bytes, app_args) in enumerate(methods_and_args)
+            ]
+        except Exception as e:
+            print(f"Error calling methods {methods}: {e}")
+            return None
+        
+        def submit(signed_txn):
+            try:
+                return self.algod_client.send_transaction(signed_txn)
+            except Exception as e:
+                return e
+        
+        # Submissions are I/O-bound, overlap their round-trips
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            submitted = list(executor.map(submit, signed_txns))
+        
+        txids = [txid for txid in submitted if not isinstance(txid, Exception)]
+        errors = {}
+        try:
+            confirmed = self.wait_for_confirmations(txids, errors=errors)
+        except Exception as e:
+            # The node itself failed; none of the pending calls are known
+            confirmed = {}
+            errors.update((txid, e) for txid in txids)
+        
+        results = []
+        for method, txid in zip(methods, submitted):
+            result = txid if isinstance(txid, Exception) else confirmed.get(txid, errors.get(txid))
+            if isinstance(result, Exception):
+                print(f"Error calling method '{method}': {result}")
+            results.append(result)
+        
+        print(f"{sum(not isinstance(r, Exception) for r in results)} of {len(methods)} methods executed successfully")
+        return results
+    
+    def _build_call_txn(self, method_bytes, app_args, params, note=None):
+        """Build an unsigned NoOp application call transaction"""
+        call_args = [method_bytes]
+        if app_args:
+            for arg in app_args:
+                call_args.append(arg.encode('utf-8') if isinstance(arg, str) else arg)
+        
+        return ApplicationCallTxn(
+            sender=self.address,
+            sp=params,
+            index=self.app_id,
+            on_complete=OnComplete.NoOpOC,
+            app_args=call_args,
+            note=note
+        )
+    
+    def read_global_state(self, verbose=True):
+        """
+        Read the global state of the application
+        
+        The state is only fetched again if this client has confirmed a
+        transaction since the last read; writes by other accounts are not
+        tracked.
+        
+        Args:
+            verbose: Print the decoded state
+        """
+        if not self.app_id:
+            print("No application deployed.")
+            return None
+        
+        if self._global_state_cache is not None and self._state_cache_round >= self._last_write_round:
+            state_data = dict(self._global_state_cache)
+            if verbose:
+                self.print_state(state_data)
+            return state_data
+        
+        try:
+            global_state = self._fetch_global_state()
+            state_data = decode_global_state(global_state)
+            self._global_state_cache = dict(state_data)
+            self._state_cache_round = max(self._last_write_round, self._known_round or 0)
+            
+            if verbose:
+                self.print_state(state_data)
             
-            print("-" * 40)
             return state_data
             
         except Exception as e:
             print(f"Error reading global state: {e}")
             return None
     
+    def _fetch_global_state(self):
+        """
+        Fetch the raw global-state list, preferring the indexer
+        
+        Reads go to the indexer when one is configured so they don't load
+        the algod node. The indexer trails algod slightly, so algod is used
+        whenever the indexer hasn't yet caught up with our last write.
+        """
+        if self.indexer_client is not None:
+            try:
+                response = self.indexer_client.applications(self.app_id)
+                if response.get('current-round', 0) >= self._last_write_round:
+                    return response['application']['params'].get('global-state', [])
+            except Exception as e:
+                print(f"Indexer read failed, using algod: {e}")
+        
+        app_info = self.algod_client.application_info(self.app_id)
+        return app_info['params']['global-state']
+    
+    def call_app_and_read(self, method_bytes, app_args=None, verbose=True):
+        """
+        Call a method and return the global state after it
+        
+        The confirmed transaction already carries a global-state-delta with
+        every key it changed, so that delta is applied to the last known
+        state instead of fetching the application again.
+        
+        Args:
+            method_bytes: Method name to call, already encoded as bytes
+            app_args: Additional arguments for the method
+            verbose: Print the resulting state
+        """
+        # Bring the local copy up to date first (free if nothing changed)
+        if self.read_global_state(verbose=False) is None:
+            return None
+        
+        txinfo = self.call_app(method_bytes, app_args)
+        if txinfo is None:
+            return None
+        
+        state = self._global_state_cache
+        for key, value in decode_state_delta(txinfo.get('global-state-delta', [])).items():
+            if value is None:
+                state.pop(key, None)
+            else:
+                state[key] = value
+        self._state_cache_round = txinfo['confirmed-round']
+        
+        if verbose:
+            self.print_state(state)
+        
+        return dict(state)
+    
+    def print_state(self, state_data):
+        """Print decoded global state"""
+        print(f"\nGlobal State for App {self.app_id}:")
+        print("-" * 40)
+        print("\n".join(f"   {key}: {value}" for key, value in state_data.items()))
+        print("-" * 40)
+    
     def increment_counter(self):
         """Increment the counter"""
-        return self.call_app("increment")
+        return self.call_app(self._METHOD_INCREMENT)
     
     def decrement_counter(self):
         """Decrement the counter"""
-        return self.call_app("decrement")
+        return self.call_app(self._METHOD_DECREMENT)
     
     def reset_counter(self):
         """Reset the counter (only creator can call)"""
-        return self.call_app("reset")
+        return self.call_app(self._METHOD_RESET)
+
+
+def decode_global_state(global_state):
+    """Decode an algod global-state list into a {key: value} dict"""
+    b64decode = base64.b64decode
+    
+    def decode_value(value):
+        if value['type'] == 1:  # byte slice
+            return b64decode(value['bytes']).decode('utf-8')
+        return value['uint']  # integer
+    
+    return {
+        b64decode(item['key']).decode('utf-8'): decode_value(item['value'])
+        for item in global_state
+    }
+
+
+def decode_state_delta(delta):
+    """
+    Decode an algod global-state-delta list into a {key: value} dict
+    
+    Deleted keys map to None.
+    """
+    b64decode = base64.b64decode
+    
+    def decode_value(value):
+        if value['action'] == 1:  # set byte slice
+            return b64decode(value.get('bytes', '')).decode('utf-8')
+        if value['action'] == 2:  # set integer
+            return value.get('uint', 0)
+        return None  # delete
+    
+    return {
+        b64decode(entry['key']).decode('utf-8'): decode_value(entry['value'])
+        for entry in delta
+    }
 
 
 def setup_algorand_client():
-    """Setup Algorand client for TestNet"""
+    """
+    Setup Algorand client for TestNet
+    
+    Returns:
+        Tuple of (client, last round), or (None, None) if the node is unreachable
+    """
     # Algorand TestNet configuration
     algod_address = "https://testnet-api.algonode.cloud"
     algod_token = ""  # Public TestNet node
     
     try:
-        client = algod.AlgodClient(algod_token, algod_address)
+        if KEEP_ALIVE_SUPPORTED:
+            client = KeepAliveAlgodClient(algod_token, algod_address)
+        else:
+            client = algod.AlgodClient(algod_token, algod_address)
         status = client.status()
         print(f"Connected to Algorand TestNet")
         print(f"   Last round: {status['last-round']}")
         print(f"   Network: {status.get('network', 'TestNet')}")
-        return client
+        return client, status['last-round']
     except Exception as e:
         print(f"Failed to connect to Algorand: {e}")
+        return None, None
+
+
+def setup_indexer_client():
+    """Setup Algorand Indexer client for TestNet (used for state reads)"""
+    indexer_address = "https://testnet-idx.algonode.cloud"
+    indexer_token = ""  # Public TestNet indexer
+    
+    try:
+        return indexer.IndexerClient(indexer_token, indexer_address)
+    except Exception as e:
+        print(f"Failed to set up Algorand indexer: {e}")
         return None
 
 
@@ -234,27 +761,40 @@ def demo_counter_app():
     print("=" * 50)
     
     # Setup client
-    algod_client = setup_algorand_client()
+    algod_client, last_round = setup_algorand_client()
     if not algod_client:
         return
     
-    # Create counter client
-    counter_client = AlgorandCounterClient(algod_client)
+    # Create counter client, reusing the round fetched during setup
+    counter_client = AlgorandCounterClient(
+        algod_client,
+        initial_round=last_round,
+        indexer_client=setup_indexer_client()
+    )
     
     # Check account balance
-    account_info = counter_client.get_account_info()
-    if not account_info or account_info['amount'] < 1_000_000:  # Less than 1 ALGO
+    balance = counter_client.account_balance()
+    if balance is not None:
+        print(f"Account balance: {balance / 1_000_000:.6f} ALGO")
+    if balance is None or balance < 1_000_000:  # Less than 1 ALGO
         print("\nYour account needs ALGO for transactions!")
         print("Get free TestNet ALGO: https://testnet.algoexplorer.io/dispenser")
         print(f"   Send to: {counter_client.address}")
         return
     
-    # Load TEAL code (you need to run simple_counter.py first)
+    # Load the programs (you need to run simple_counter.py first), preferring
+    # the bytecode written by 'simple_counter.py --tok' over TEAL source
     try:
-        with open('counter_approval.teal', 'r') as f:
-            approval_teal = f.read()
-        with open('counter_clear.teal', 'r') as f:
-            clear_teal = f.read()
+        if os.path.exists('counter_approval.tok') and os.path.exists('counter_clear.tok'):
+            with open('counter_approval.tok', 'rb') as f:
+                approval_teal = f.read()
+            with open('counter_clear.tok', 'rb') as f:
+                clear_teal = f.read()
+        else:
+            with open('counter_approval.teal', 'r') as f:
+                approval_teal = f.read()
+            with open('counter_clear.teal', 'r') as f:
+                clear_teal = f.read()
     except FileNotFoundError:
         print("TEAL files not found. Run 'python simple_counter.py' first.")
         return
@@ -271,23 +811,26 @@ def demo_counter_app():
     # Demonstrate counter operations
     print("\nTesting Counter Operations:")
     
-    # Increment counter 3 times
-    for i in range(3):
-        print(f"\nIncrement #{i+1}")
-        counter_client.increment_counter()
-        time.sleep(1)  # Brief pause
+    # Increment counter 3 times in one atomic group
+    print("\nIncrement x3 (atomic group)")
+    counter_client.call_app_batch([(AlgorandCounterClient._METHOD_INCREMENT, None)] * 3)
+    if VERBOSE_DEMO:
+        time.sleep(1)
+    
+    # Two more increments as independent calls, submitted concurrently
+    print("\nIncrement x2 (independent calls)")
+    counter_client.call_many([(AlgorandCounterClient._METHOD_INCREMENT, None)] * 2)
     
     # Read state after increments
     print("\nState after increments:")
     state = counter_client.read_global_state()
     
-    # Decrement counter once
+    # Decrement counter once, final state comes back with the confirmation
     print(f"\nDecrement counter")
-    counter_client.decrement_counter()
+    final_state = counter_client.call_app_and_read(AlgorandCounterClient._METHOD_DECREMENT, verbose=False)
     
-    # Read final state
     print("\nFinal State:")
-    final_state = counter_client.read_global_state()
+    counter_client.print_state(final_state)
     
     # Display summary
     print(f"\nDemo Summary:")
@@ -7,8 +7,28 @@ Demonstrates core Algorand development concepts:
 - Algorand's unique features (atomic transactions, low fees)
 """
 
+import base64
+import functools
+import os
+import sys
+
 from pyteal import *
 
+# Global state keys, shared so each compiles to a single constant
+COUNTER_KEY = Bytes("counter")
+CREATOR_KEY = Bytes("creator")
+TOTAL_INCREMENTS_KEY = Bytes("total_increments")
+TOTAL_DECREMENTS_KEY = Bytes("total_decrements")
+
+# Additional keys used by the advanced contract
+TOTAL_USERS_KEY = Bytes("total_users")
+GLOBAL_COUNTER_KEY = Bytes("global_counter")
+MIN_TIME_KEY = Bytes("min_time_between_updates")
+PERSONAL_COUNTER_KEY = Bytes("personal_counter")
+TOTAL_OPERATIONS_KEY = Bytes("total_operations")
+JOINED_TIMESTAMP_KEY = Bytes("joined_timestamp")
+LAST_OPERATION_KEY = Bytes("last_operation")
+
 def approval_program():
     """
     Main smart contract logic for Algorand Counter App
@@ -20,45 +40,46 @@ def approval_program():
     - Security checks and validation
     """
     
+    # Current counter value, read once per call
+    counter = ScratchVar(TealType.uint64)
+    
     # Define application methods
     on_creation = Seq([
-        App.globalPut(Bytes("counter"), Int(0)),
-        App.globalPut(Bytes("creator"), Txn.sender()),
-        App.globalPut(Bytes("total_increments"), Int(0)),
-        App.globalPut(Bytes("total_decrements"), Int(0)),
+        App.globalPut(COUNTER_KEY, Int(0)),
+        App.globalPut(CREATOR_KEY, Txn.sender()),
+        App.globalPut(TOTAL_INCREMENTS_KEY, Int(0)),
+        App.globalPut(TOTAL_DECREMENTS_KEY, Int(0)),
         Return(Int(1))
     ])
     
     # Increment counter method
     on_increment = Seq([
+        counter.store(App.globalGet(COUNTER_KEY)),
+        
         # Security check: ensure counter doesn't overflow
-        Assert(App.globalGet(Bytes("counter")) < Int(1000000)),
+        Assert(counter.load() < Int(1000000)),
         
         # Increment counter and track total increments
+        App.globalPut(COUNTER_KEY, counter.load() + Int(1)),
         App.globalPut(
-            Bytes("counter"), 
-            App.globalGet(Bytes("counter")) + Int(1)
-        ),
-        App.globalPut(
-            Bytes("total_increments"),
-            App.globalGet(Bytes("total_increments")) + Int(1)
+            TOTAL_INCREMENTS_KEY,
+            App.globalGet(TOTAL_INCREMENTS_KEY) + Int(1)
         ),
         Return(Int(1))
     ])
     
     # Decrement counter method
     on_decrement = Seq([
+        counter.store(App.globalGet(COUNTER_KEY)),
+        
         # Security check: ensure counter doesn't go negative
-        Assert(App.globalGet(Bytes("counter")) > Int(0)),
+        Assert(counter.load() > Int(0)),
         
         # Decrement counter and track total decrements
+        App.globalPut(COUNTER_KEY, counter.load() - Int(1)),
         App.globalPut(
-            Bytes("counter"),
-            App.globalGet(Bytes("counter")) - Int(1)
-        ),
-        App.globalPut(
-            Bytes("total_decrements"),
-            App.globalGet(Bytes("total_decrements")) + Int(1)
+            TOTAL_DECREMENTS_KEY,
+            App.globalGet(TOTAL_DECREMENTS_KEY) + Int(1)
         ),
         Return(Int(1))
     ])
@@ -66,10 +87,10 @@ def approval_program():
     # Reset counter method (only creator can call)
     on_reset = Seq([
         # Security check: only creator can reset
-        Assert(Txn.sender() == App.globalGet(Bytes("creator"))),
+        Assert(Txn.sender() == App.globalGet(CREATOR_KEY)),
         
         # Reset counter but keep statistics
-        App.globalPut(Bytes("counter"), Int(0)),
+        App.globalPut(COUNTER_KEY, Int(0)),
         Return(Int(1))
     ])
     
@@ -78,7 +99,11 @@ def approval_program():
         # Application creation
         [Txn.application_id() == Int(0), on_creation],
         
-        # Method calls (based on first argument)
+        # Method calls (based on first argument). Only NoOp calls are
+        # routed; any other on-completion, such as an OptIn carrying a
+        # method name, falls through to the rejection below, as before.
+        # Method names are compiled into a shared bytecblock so each
+        # comparison is a single bytec load.
         [And(
             Txn.on_completion() == OnCall.NoOp,
             Txn.application_args.length() > Int(0),
@@ -89,7 +114,7 @@ def approval_program():
         )],
         
         # Default: reject all other calls
-        [Int(1) == Int(1), Return(Int(0))]
+        [Int(1), Reject()]
     )
     
     return program
@@ -101,18 +126,49 @@ def clear_state_program():
     """
     return Return(Int(1))
 
+@functools.lru_cache(maxsize=1)
 def compile_contract():
     """
     Compile the PyTeal contract to TEAL bytecode
+    
+    The contract is fixed, so the result is computed once and reused.
     """
     # Compile approval program
-    approval_teal = compileTeal(approval_program(), Mode.Application, version=6)
+    approval_teal = compileTeal(approval_program(), Mode.Application, version=6, assembleConstants=True)
     
     # Compile clear state program  
-    clear_teal = compileTeal(clear_state_program(), Mode.Application, version=6)
+    clear_teal = compileTeal(clear_state_program(), Mode.Application, version=6, assembleConstants=True)
     
     return approval_teal, clear_teal
 
+def write_compiled_program(algod_client, teal_source, path):
+    """
+    Compile TEAL source with an algod node and save the raw program bytes
+    
+    The resulting .tok file can be deployed without another compile call.
+    """
+    result = algod_client.compile(teal_source)
+    _dump_teal([(path, base64.b64decode(result["result"]))])
+
+def _dump_teal(pairs):
+    """
+    Write (path, content) pairs straight to disk
+    
+    TEAL is plain ASCII, so it is encoded once and written with os.write
+    (a single call unless the OS accepts only part of the buffer) instead
+    of going through a text-mode file object.
+    """
+    for path, content in pairs:
+        if isinstance(content, str):
+            content = content.encode("ascii")
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            view = memoryview(content)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+
 def get_global_schema():
     """
     Define the global state schema for the application
@@ -150,63 +206,71 @@ def advanced_approval_program():
     
     # Application creation
     on_creation = Seq([
-        App.globalPut(Bytes("total_users"), Int(0)),
-        App.globalPut(Bytes("global_counter"), Int(0)),
-        App.globalPut(Bytes("creator"), Txn.sender()),
-        App.globalPut(Bytes("min_time_between_updates"), Int(10)), # 10 seconds
+        App.globalPut(TOTAL_USERS_KEY, Int(0)),
+        App.globalPut(GLOBAL_COUNTER_KEY, Int(0)),
+        App.globalPut(CREATOR_KEY, Txn.sender()),
+        App.globalPut(MIN_TIME_KEY, Int(10)), # 10 seconds
         Return(Int(1))
     ])
     
+    # Local state of the caller: account index 0 always refers to the
+    # sender and assembles to a shared int constant rather than `txn Sender`
+    sender = Int(0)
+    
     # User registration (opt-in)
     on_opt_in = Seq([
         # Initialize user's local state
-        App.localPut(Txn.sender(), Bytes("personal_counter"), Int(0)),
-        App.localPut(Txn.sender(), Bytes("total_operations"), Int(0)),
-        App.localPut(Txn.sender(), Bytes("joined_timestamp"), Global.latest_timestamp()),
+        App.localPut(sender, PERSONAL_COUNTER_KEY, Int(0)),
+        App.localPut(sender, TOTAL_OPERATIONS_KEY, Int(0)),
+        App.localPut(sender, JOINED_TIMESTAMP_KEY, Global.latest_timestamp()),
         
         # Update global user count
         App.globalPut(
-            Bytes("total_users"),
-            App.globalGet(Bytes("total_users")) + Int(1)
+            TOTAL_USERS_KEY,
+            App.globalGet(TOTAL_USERS_KEY) + Int(1)
         ),
         Return(Int(1))
     ])
     
+    # Time of the sender's last operation, read once per call
+    last_op = ScratchVar(TealType.uint64)
+    
     # Increment with time restrictions
     on_increment_advanced = Seq([
         # Check if user has opted in
-        Assert(App.optedIn(Txn.sender(), Txn.application_id())),
+        Assert(App.optedIn(sender, Txn.application_id())),
         
         # Time-based restriction (prevent spam)
+        last_op.store(App.localGet(sender, LAST_OPERATION_KEY)),
         Assert(
             Or(
-                App.localGet(Txn.sender(), Bytes("last_operation")) == Int(0),
+                last_op.load() == Int(0),
                 Global.latest_timestamp() > 
-                App.localGet(Txn.sender(), Bytes("last_operation")) + 
-                App.globalGet(Bytes("min_time_between_updates"))
+                last_op.load() + 
+                App.globalGet(MIN_TIME_KEY)
             )
         ),
         
         # Increment personal counter
         App.localPut(
-            Txn.sender(),
-            Bytes("personal_counter"),
-            App.localGet(Txn.sender(), Bytes("personal_counter")) + Int(1)
+            sender,
+            PERSONAL_COUNTER_KEY,
+            App.localGet(sender, PERSONAL_COUNTER_KEY) + Int(1)
         ),
         
         # Increment global counter
         App.globalPut(
-            Bytes("global_counter"),
-            App.globalGet(Bytes("global_counter")) + Int(1)
+            GLOBAL_COUNTER_KEY,
+            App.globalGet(GLOBAL_COUNTER_KEY) + Int(1)
         ),
         
         # Update operation tracking
         App.localPut(
-            Txn.sender(),
-            Bytes("total_operations"),
-            App.localGet(Txn.sender(), Bytes("total_operations")) + Int(1)
+            sender,
+            TOTAL_OPERATIONS_KEY,
+            App.localGet(sender, TOTAL_OPERATIONS_KEY) + Int(1)
         ),
-        App.localPut(Txn.sender(), Bytes("last_operation"), Global.latest_timestamp()),
+        App.localPut(sender, LAST_OPERATION_KEY, Global.latest_timestamp()),
         
         Return(Int(1))
     ])
@@ -214,7 +278,7 @@ def advanced_approval_program():
     # Reward system (creator can reward active users)
     on_reward = Seq([
         # Only creator can distribute rewards
-        Assert(Txn.sender() == App.globalGet(Bytes("creator"))),
+        Assert(Txn.sender() == App.globalGet(CREATOR_KEY)),
         
         # Verify reward recipient exists
         Assert(Txn.application_args.length() >= Int(2)),
@@ -242,11 +306,20 @@ def advanced_approval_program():
         )],
         
         # Default rejection
-        [Int(1) == Int(1), Return(Int(0))]
+        [Int(1), Reject()]
     )
     
     return program
 
+@functools.lru_cache(maxsize=1)
+def compile_advanced_contract():
+    """
+    Compile the advanced approval program to TEAL bytecode
+    
+    Cached like compile_contract.
+    """
+    return compileTeal(advanced_approval_program(), Mode.Application, version=6, assembleConstants=True)
+
 if __name__ == "__main__":
     """
     Main execution: compile contracts and display information
@@ -259,16 +332,33 @@ if __name__ == "__main__":
     approval_teal, clear_teal = compile_contract()
     
     # Save compiled TEAL code to files
-    with open("counter_approval.teal", "w") as f:
-        f.write(approval_teal)
-    
-    with open("counter_clear.teal", "w") as f:
-        f.write(clear_teal)
+    _dump_teal([
+        ("counter_approval.teal", approval_teal),
+        ("counter_clear.teal", clear_teal),
+    ])
     
     print("Contract compiled successfully!")
     print("   - Approval program: counter_approval.teal")
     print("   - Clear state program: counter_clear.teal")
     
+    # Optionally assemble the TEAL into program bytes with a TestNet node
+    if "--tok" in sys.argv:
+        from algosdk.v2client import algod
+        
+        algod_client = algod.AlgodClient("", "https://testnet-api.algonode.cloud")
+        write_compiled_program(algod_client, approval_teal, "counter_approval.tok")
+        write_compiled_program(algod_client, clear_teal, "counter_clear.tok")
+        
+        print("   - Approval bytecode: counter_approval.tok")
+        print("   - Clear state bytecode: counter_clear.tok")
+    else:
+        # client.py deploys .tok files in preference to the TEAL, so drop
+        # any left over from an older build of the contract
+        for path in ("counter_approval.tok", "counter_clear.tok"):
+            if os.path.exists(path):
+                os.remove(path)
+                print(f"   - Removed stale bytecode: {path}")
+    
     # Display schema information
     global_schema = get_global_schema()
     local_schema = get_local_schema()
@@ -279,10 +369,9 @@ if __name__ == "__main__":
     
     # Compile advanced contract
     print("\nCompiling advanced counter contract...")
-    advanced_approval_teal = compileTeal(advanced_approval_program(), Mode.Application, version=6)
+    advanced_approval_teal = compile_advanced_contract()
     
-    with open("counter_advanced_approval.teal", "w") as f:
-        f.write(advanced_approval_teal)
+    _dump_teal([("counter_advanced_approval.teal", advanced_approval_teal)])
     
     print("Advanced contract compiled!")
     print("   - Advanced approval: counter_advanced_approval.teal")
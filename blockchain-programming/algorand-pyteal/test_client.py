@@ -0,0 +1,295 @@
+"""
+Test suite for the Algorand Counter Client
+Runs against mocked algod and indexer clients, so no network is needed
+"""
+
+import base64
+import types
+import unittest
+from unittest import mock
+
+from algosdk import account
+
+from client import AlgorandCounterClient, BlockCursor, decode_global_state, decode_state_delta
+
+
+def b64(text):
+    """Base64-encode a str the way algod returns keys and byte values"""
+    return base64.b64encode(text.encode()).decode()
+
+
+def make_algod(last_round=100):
+    """Mock algod whose chain advances one round per status_after_block"""
+    algod_client = mock.MagicMock()
+    algod_client.status.return_value = {'last-round': last_round}
+    algod_client.status_after_block.side_effect = lambda round_number: {'last-round': round_number + 1}
+    return algod_client
+
+
+def make_client(algod_client=None, indexer_client=None, initial_round=100):
+    """Counter client with a fresh key and a deployed app"""
+    private_key, _ = account.generate_account()
+    client = AlgorandCounterClient(algod_client or make_algod(initial_round), private_key=private_key,
+                                   initial_round=initial_round, indexer_client=indexer_client)
+    client.app_id = 1
+    return client
+
+
+class TestBlockCursor(unittest.TestCase):
+    """Test local round tracking"""
+    
+    def test_start_round_from_status(self):
+        """Test the cursor asks for the status only when no round is given"""
+        algod_client = make_algod(42)
+        self.assertEqual(BlockCursor(algod_client).round, 42)
+        self.assertEqual(BlockCursor(algod_client, 7).round, 7)
+        algod_client.status.assert_called_once()
+    
+    def test_next_waits_for_the_following_round(self):
+        """Test next long-polls from the current round"""
+        algod_client = make_algod()
+        cursor = BlockCursor(algod_client, 100)
+        
+        self.assertEqual(cursor.next(), 101)
+        algod_client.status_after_block.assert_called_once_with(100)
+    
+    def test_next_catches_up_after_idle(self):
+        """Test next jumps straight to the latest round if the chain moved on"""
+        algod_client = make_algod()
+        algod_client.status_after_block.side_effect = None
+        algod_client.status_after_block.return_value = {'last-round': 500}
+        
+        self.assertEqual(BlockCursor(algod_client, 100).next(), 500)
+    
+    def test_advance_to_only_moves_forward(self):
+        """Test advance_to never moves the cursor back"""
+        cursor = BlockCursor(make_algod(), 100)
+        cursor.advance_to(120)
+        cursor.advance_to(110)
+        self.assertEqual(cursor.round, 120)
+
+
+class TestWaitForConfirmations(unittest.TestCase):
+    """Test confirmation waits, timeouts and pool errors"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.algod = make_algod()
+        self.client = make_client(self.algod)
+    
+    def test_confirms_after_waiting(self):
+        """Test a transaction is re-checked after each block until it confirms"""
+        self.algod.pending_transaction_info.side_effect = [{'confirmed-round': 0}, {'confirmed-round': 101}]
+        
+        confirmed = self.client.wait_for_confirmations(["tx1"])
+        
+        self.assertEqual(confirmed, {"tx1": {'confirmed-round': 101}})
+        self.assertEqual(self.algod.status_after_block.call_count, 1)
+        self.assertEqual(self.client._known_round, 101)
+        self.assertEqual(self.client._last_write_round, 101)
+    
+    def test_rounds_counted_per_call(self):
+        """Test a cursor catching up over many rounds counts as one round waited"""
+        self.algod.status_after_block.side_effect = None
+        self.algod.status_after_block.return_value = {'last-round': 500}
+        self.algod.pending_transaction_info.side_effect = [
+            {'confirmed-round': 0}, {'confirmed-round': 0}, {'confirmed-round': 500},
+        ]
+        
+        confirmed = self.client.wait_for_confirmations(["tx1"], max_rounds=2)
+        self.assertEqual(confirmed["tx1"]['confirmed-round'], 500)
+    
+    def test_timeout(self):
+        """Test waiting stops after max_rounds blocks"""
+        self.algod.pending_transaction_info.return_value = {'confirmed-round': 0}
+        
+        with self.assertRaises(TimeoutError):
+            self.client.wait_for_confirmations(["tx1"], max_rounds=3)
+        self.assertEqual(self.algod.status_after_block.call_count, 3)
+    
+    def test_pool_error_raises(self):
+        """Test a rejected transaction stops the wait immediately"""
+        self.algod.pending_transaction_info.return_value = {'pool-error': "overspend"}
+        
+        with self.assertRaises(RuntimeError):
+            self.client.wait_for_confirmations(["tx1"])
+        self.algod.status_after_block.assert_not_called()
+    
+    def test_errors_collected_per_txid(self):
+        """Test an errors dict keeps other confirmations when one fails"""
+        infos = {
+            "good": {'confirmed-round': 101},
+            "rejected": {'pool-error': "overspend"},
+            "stuck": {'confirmed-round': 0},
+        }
+        self.algod.pending_transaction_info.side_effect = lambda txid: infos[txid]
+        
+        errors = {}
+        confirmed = self.client.wait_for_confirmations(["good", "rejected", "stuck"], max_rounds=1, errors=errors)
+        
+        self.assertEqual(list(confirmed), ["good"])
+        self.assertIsInstance(errors["rejected"], RuntimeError)
+        self.assertIsInstance(errors["stuck"], TimeoutError)
+
+
+class TestSuggestedParams(unittest.TestCase):
+    """Test the suggested params cache"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.algod = make_algod()
+        self.algod.suggested_params.side_effect = lambda: types.SimpleNamespace(first=100, last=1100, fee=0)
+        self.client = make_client(self.algod)
+    
+    def test_reused_within_ttl(self):
+        """Test a recent fetch is reused and handed out as a copy"""
+        with mock.patch("client.time.monotonic", return_value=1000.0):
+            params = self.client._get_params()
+            params.fee = 5
+            self.assertEqual(self.client._get_params().fee, 0)
+        self.algod.suggested_params.assert_called_once()
+    
+    def test_expires_after_ttl(self):
+        """Test the cache is refetched once it is older than the TTL, even with no new rounds"""
+        with mock.patch("client.time.monotonic", return_value=1000.0):
+            self.client._get_params(ttl_seconds=15)
+        with mock.patch("client.time.monotonic", return_value=1016.0):
+            self.client._get_params(ttl_seconds=15)
+        self.assertEqual(self.algod.suggested_params.call_count, 2)
+    
+    def test_validity_follows_known_round(self):
+        """Test cached params start at the latest round this client has seen"""
+        with mock.patch("client.time.monotonic", return_value=1000.0):
+            self.client._get_params()
+            self.client._known_round = 150
+            params = self.client._get_params()
+        self.assertEqual((params.first, params.last), (150, 1150))
+
+
+class TestStateDecoding(unittest.TestCase):
+    """Test decoding of algod state and state deltas"""
+    
+    def test_decode_global_state(self):
+        """Test byte-slice and integer values decode by type"""
+        global_state = [
+            {'key': b64("counter"), 'value': {'type': 2, 'uint': 3}},
+            {'key': b64("creator"), 'value': {'type': 1, 'bytes': b64("alice")}},
+        ]
+        self.assertEqual(decode_global_state(global_state), {"counter": 3, "creator": "alice"})
+    
+    def test_decode_state_delta(self):
+        """Test set and delete actions decode, with deletes as None"""
+        delta = [
+            {'key': b64("counter"), 'value': {'action': 2, 'uint': 4}},
+            {'key': b64("note"), 'value': {'action': 1, 'bytes': b64("hi")}},
+            {'key': b64("old"), 'value': {'action': 3}},
+        ]
+        self.assertEqual(decode_state_delta(delta), {"counter": 4, "note": "hi", "old": None})
+
+
+class TestGlobalStateReads(unittest.TestCase):
+    """Test global state caching and the indexer fallback"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.algod = make_algod()
+        self.algod.application_info.return_value = {
+            'params': {'global-state': [{'key': b64("counter"), 'value': {'type': 2, 'uint': 1}}]}
+        }
+        self.indexer = mock.MagicMock()
+    
+    def test_cached_until_own_write(self):
+        """Test state is fetched again only after this client confirms a write"""
+        client = make_client(self.algod)
+        
+        self.assertEqual(client.read_global_state(verbose=False), {"counter": 1})
+        self.assertEqual(client.read_global_state(verbose=False), {"counter": 1})
+        self.assertEqual(self.algod.application_info.call_count, 1)
+        
+        client._last_write_round = 105
+        client.read_global_state(verbose=False)
+        self.assertEqual(self.algod.application_info.call_count, 2)
+    
+    def test_indexer_preferred_when_caught_up(self):
+        """Test reads go to the indexer when it has our last write"""
+        self.indexer.applications.return_value = {
+            'current-round': 105,
+            'application': {'params': {'global-state': [{'key': b64("counter"), 'value': {'type': 2, 'uint': 7}}]}},
+        }
+        client = make_client(self.algod, self.indexer)
+        client._last_write_round = 105
+        
+        self.assertEqual(client.read_global_state(verbose=False), {"counter": 7})
+        self.algod.application_info.assert_not_called()
+    
+    def test_algod_used_when_indexer_lags(self):
+        """Test a lagging or failing indexer falls back to algod"""
+        self.indexer.applications.return_value = {'current-round': 104, 'application': {'params': {}}}
+        client = make_client(self.algod, self.indexer)
+        client._last_write_round = 105
+        
+        self.assertEqual(client.read_global_state(verbose=False), {"counter": 1})
+        self.algod.application_info.assert_called_once()
+        
+        self.indexer.applications.side_effect = Exception("indexer down")
+        client._last_write_round = 106
+        self.assertEqual(client.read_global_state(verbose=False), {"counter": 1})
+        self.assertEqual(self.algod.application_info.call_count, 2)
+    
+    def test_call_app_and_read_applies_delta(self):
+        """Test the confirmed delta updates the cached state without another fetch"""
+        client = make_client(self.algod)
+        txinfo = {
+            'confirmed-round': 106,
+            'global-state-delta': [
+                {'key': b64("counter"), 'value': {'action': 2, 'uint': 2}},
+                {'key': b64("total_increments"), 'value': {'action': 2, 'uint': 1}},
+            ],
+        }
+        
+        with mock.patch.object(client, "call_app", return_value=txinfo):
+            client._last_write_round = 106
+            state = client.call_app_and_read(AlgorandCounterClient._METHOD_INCREMENT, verbose=False)
+        
+        self.assertEqual(state, {"counter": 2, "total_increments": 1})
+        self.assertEqual(client.read_global_state(verbose=False), state)
+        self.algod.application_info.assert_called_once()
+
+
+class TestCallMany(unittest.TestCase):
+    """Test concurrent independent calls"""
+    
+    def test_failures_are_reported_per_call(self):
+        """Test one failed call doesn't lose the others' confirmations"""
+        algod_client = make_algod()
+        client = make_client(algod_client)
+        
+        def send_transaction(signed_txn):
+            if signed_txn.note == b"2":
+                raise ConnectionError("submit failed")
+            return f"tx{signed_txn.note.decode()}"
+        
+        def build_call_txn(method_bytes, app_args, params, note=None):
+            txn = mock.MagicMock()
+            txn.sign.return_value = types.SimpleNamespace(note=note)
+            return txn
+        
+        infos = {"tx0": {'confirmed-round': 101}, "tx1": {'pool-error': "overspend"}}
+        algod_client.send_transaction.side_effect = send_transaction
+        algod_client.pending_transaction_info.side_effect = lambda txid: infos[txid]
+        
+        with mock.patch.object(client, "_build_call_txn", side_effect=build_call_txn), \
+                mock.patch.object(client, "_get_params", return_value=None):
+            results = client.call_many([(AlgorandCounterClient._METHOD_INCREMENT, None)] * 3)
+        
+        self.assertEqual(results[0], {'confirmed-round': 101})
+        self.assertIsInstance(results[1], RuntimeError)
+        self.assertIsInstance(results[2], ConnectionError)
+
+
+if __name__ == "__main__":
+    print("Running Algorand Client Tests")
+    print("=" * 50)
+    
+    # Run all tests
+    unittest.main(verbosity=2)
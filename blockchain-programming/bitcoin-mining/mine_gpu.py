@@ -0,0 +1,164 @@
+"""
+CUDA double SHA-256 nonce search
+Runs one GPU thread per nonce: each thread splices its nonce into a private
+copy of the tail block(s), compresses them from the shared midstate in
+registers, hashes the digest once more and checks the leading zero hex
+digits. Winners race on an atomic min so a wave returns its lowest valid
+nonce, same as mine_kernel.
+
+Requires numba with a CUDA-capable GPU; importing raises ImportError
+otherwise. Set NUMBA_ENABLE_CUDASIM=1 to run it on the CPU simulator.
+"""
+
+import numpy as np
+from numba import cuda
+
+from mine_kernel import H0, K, NONCE_SIZE, prepare
+
+
+if not cuda.is_available():
+    raise ImportError("no CUDA device available")
+
+# Nonces tried per kernel launch
+WAVE_SIZE = 1 << 20
+THREADS_PER_BLOCK = 256
+
+_NO_WINNER = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+@cuda.jit(device=True, inline=True)
+def _rotr(x, n):
+    """Rotate a 32-bit word right by n bits"""
+    return ((x >> n) | (x << (32 - n))) & 0xFFFFFFFF
+
+
+@cuda.jit(device=True)
+def _compress(state, w, k):
+    """Compress the block whose 16 message words are loaded in w into state"""
+    for i in range(16, 64):
+        x = w[i - 15]
+        y = w[i - 2]
+        s0 = _rotr(x, 7) ^ _rotr(x, 18) ^ (x >> 3)
+        s1 = _rotr(y, 17) ^ _rotr(y, 19) ^ (y >> 10)
+        w[i] = (w[i - 16] + s0 + w[i - 7] + s1) & 0xFFFFFFFF
+
+    a, b, c, d = state[0], state[1], state[2], state[3]
+    e, f, g, h = state[4], state[5], state[6], state[7]
+    for i in range(64):
+        s1 = _rotr(e, 6) ^ _rotr(e, 11) ^ _rotr(e, 25)
+        ch = (e & f) ^ (~e & g)
+        t1 = (h + s1 + ch + k[i] + w[i]) & 0xFFFFFFFF
+        s0 = _rotr(a, 2) ^ _rotr(a, 13) ^ _rotr(a, 22)
+        maj = (a & b) ^ (a & c) ^ (b & c)
+        h = g
+        g = f
+        f = e
+        e = (d + t1) & 0xFFFFFFFF
+        d = c
+        c = b
+        b = a
+        a = (t1 + s0 + maj) & 0xFFFFFFFF
+    state[0] = (state[0] + a) & 0xFFFFFFFF
+    state[1] = (state[1] + b) & 0xFFFFFFFF
+    state[2] = (state[2] + c) & 0xFFFFFFFF
+    state[3] = (state[3] + d) & 0xFFFFFFFF
+    state[4] = (state[4] + e) & 0xFFFFFFFF
+    state[5] = (state[5] + f) & 0xFFFFFFFF
+    state[6] = (state[6] + g) & 0xFFFFFFFF
+    state[7] = (state[7] + h) & 0xFFFFFFFF
+
+
+@cuda.jit
+def _mine_wave(midstate, words, nblocks, nonce_off, difficulty, base, count, k, h0, winner):
+    """One thread per nonce in [base, base + count); lowest hit goes to winner[0]"""
+    tid = cuda.grid(1)
+    if tid >= count:
+        return
+    nonce = base + tid
+
+    state = cuda.local.array(8, np.int64)
+    w = cuda.local.array(64, np.int64)
+    for r in range(8):
+        state[r] = midstate[r]
+
+    for block in range(nblocks):
+        for i in range(16):
+            w[i] = words[block * 16 + i]
+        for b in range(NONCE_SIZE):
+            pos = nonce_off + b
+            if pos // 64 == block:
+                w[(pos % 64) // 4] |= ((nonce >> (8 * b)) & 0xFF) << (24 - 8 * (pos % 4))
+
+        _compress(state, w, k)
+
+    # Outer SHA-256 of the 32-byte digest: one block with constant padding
+    for i in range(8):
+        w[i] = state[i]
+        state[i] = h0[i]
+    w[8] = 0x80000000
+    for i in range(9, 15):
+        w[i] = 0
+    w[15] = 256
+    _compress(state, w, k)
+
+    # Early exit on the first nonzero nibble
+    for n in range(difficulty):
+        if (state[n >> 3] >> (28 - 4 * (n & 7))) & 0xF:
+            return
+    cuda.atomic.min(winner, 0, np.uint64(nonce))
+
+
+def _tail_words(tail):
+    """Pack the padded tail bytes into big-endian 32-bit words"""
+    return tail.astype(np.uint8).view('>u4').astype(np.int64)
+
+
+# Round constants and initial state never change, so they're uploaded once
+_d_k = cuda.to_device(K)
+_d_h0 = cuda.to_device(H0)
+
+# Device copy of the last prefix searched: (prefix, midstate, words, nblocks, nonce_off)
+_prepared = None
+
+
+def _launch(d_midstate, d_words, nblocks: int, nonce_off: int, difficulty: int, base_nonce: int, count: int):
+    """Run one wave over device-resident midstate and tail words, returns the lowest winner or None"""
+    winner = cuda.to_device(np.array([_NO_WINNER], dtype=np.uint64))
+
+    blocks = (count + THREADS_PER_BLOCK - 1) // THREADS_PER_BLOCK
+    _mine_wave[blocks, THREADS_PER_BLOCK](
+        d_midstate, d_words, nblocks, nonce_off, difficulty, base_nonce, count, _d_k, _d_h0, winner
+    )
+
+    result = winner.copy_to_host()[0]
+    return None if result == _NO_WINNER else int(result)
+
+
+def mine_gpu(midstate, tail, nonce_off: int, difficulty: int, base_nonce: int, count: int):
+    """
+    Scan nonces in [base_nonce, base_nonce + count) on the GPU
+    midstate, tail and nonce_off come from mine_kernel.prepare.
+    Returns the lowest winning nonce, or None.
+    """
+    return _launch(cuda.to_device(midstate), cuda.to_device(_tail_words(tail)), tail.shape[0] // 64,
+                   nonce_off, difficulty, base_nonce, count)
+
+
+def find_nonce(prefix: bytes, difficulty: int, start: int, stop: int) -> int:
+    """
+    Find the first nonce in [start, stop) for prefix, or -1
+    A search calls this once per wave with the same prefix, so the prefix
+    is prepared and uploaded only when it differs from the previous call.
+    """
+    global _prepared
+    if _prepared is None or _prepared[0] != prefix:
+        midstate, tail, nonce_off = prepare(prefix)
+        _prepared = (prefix, cuda.to_device(midstate), cuda.to_device(_tail_words(tail)),
+                     tail.shape[0] // 64, nonce_off)
+    _, d_midstate, d_words, nblocks, nonce_off = _prepared
+
+    for base in range(start, stop, WAVE_SIZE):
+        nonce = _launch(d_midstate, d_words, nblocks, nonce_off, difficulty, base, min(WAVE_SIZE, stop - base))
+        if nonce is not None:
+            return nonce
+    return -1
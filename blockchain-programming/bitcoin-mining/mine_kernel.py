@@ -0,0 +1,285 @@
+"""
+Numba-compiled double SHA-256 nonce search
+Mining hashes the same header prefix over and over with only the nonce
+changing. This kernel:
+- Compresses the constant prefix blocks once (the "midstate")
+- Re-compresses only the tail block(s) holding the nonce per attempt
+- Hashes the 32-byte inner digest again as one block with constant padding
+- Hashes LANES nonces side by side so LLVM can vectorize across them
+- Checks leading zero hex digits straight on the SHA-256 state words
+
+Requires numba and numpy; simple_bitcoin falls back to hashlib without them.
+"""
+
+import numpy as np
+from numba import njit
+
+
+# SHA-256 round constants
+K = np.array([
+    0x428a2f98, 0x71374491, 0xb5c0fbcf, 0xe9b5dba5, 0x3956c25b, 0x59f111f1, 0x923f82a4, 0xab1c5ed5,
+    0xd807aa98, 0x12835b01, 0x243185be, 0x550c7dc3, 0x72be5d74, 0x80deb1fe, 0x9bdc06a7, 0xc19bf174,
+    0xe49b69c1, 0xefbe4786, 0x0fc19dc6, 0x240ca1cc, 0x2de92c6f, 0x4a7484aa, 0x5cb0a9dc, 0x76f988da,
+    0x983e5152, 0xa831c66d, 0xb00327c8, 0xbf597fc7, 0xc6e00bf3, 0xd5a79147, 0x06ca6351, 0x14292967,
+    0x27b70a85, 0x2e1b2138, 0x4d2c6dfc, 0x53380d13, 0x650a7354, 0x766a0abb, 0x81c2c92e, 0x92722c85,
+    0xa2bfe8a1, 0xa81a664b, 0xc24b8b70, 0xc76c51a3, 0xd192e819, 0xd6990624, 0xf40e3585, 0x106aa070,
+    0x19a4c116, 0x1e376c08, 0x2748774c, 0x34b0bcb5, 0x391c0cb3, 0x4ed8aa4a, 0x5b9cca4f, 0x682e6ff3,
+    0x748f82ee, 0x78a5636f, 0x84c87814, 0x8cc70208, 0x90befffa, 0xa4506ceb, 0xbef9a3f7, 0xc67178f2,
+], dtype=np.int64)
+
+# SHA-256 initial hash state
+H0 = np.array([
+    0x6a09e667, 0xbb67ae85, 0x3c6ef372, 0xa54ff53a, 0x510e527f, 0x9b05688c, 0x1f83d9ab, 0x5be0cd19,
+], dtype=np.int64)
+
+NONCE_SIZE = 4  # Nonce is packed as 4 little-endian bytes, as in Bitcoin headers
+
+# Nonces hashed together by mine_multi. Every lane runs the same
+# instructions, so the inner lane loops compile to SIMD (AVX2/AVX-512/NEON)
+LANES = 16
+
+
+@njit(cache=True, inline='always')
+def _rotr(x, n):
+    """Rotate a 32-bit word right by n bits"""
+    return ((x >> n) | (x << (32 - n))) & 0xFFFFFFFF
+
+
+@njit(cache=True)
+def sha256_compress(state, data, offset, w):
+    """
+    Compress one 64-byte block of data (starting at offset) into state in place
+
+    state holds the 8 hash words; w is a 64-word scratch buffer for the
+    message schedule so the hot loop doesn't allocate.
+    """
+    for i in range(16):
+        j = offset + 4 * i
+        w[i] = (data[j] << 24) | (data[j + 1] << 16) | (data[j + 2] << 8) | data[j + 3]
+    _compress_words(state, w)
+
+
+@njit(cache=True, inline='always')
+def _compress_words(state, w):
+    """Compress the block whose 16 message words are already loaded into w"""
+    for i in range(16, 64):
+        s0 = _rotr(w[i - 15], 7) ^ _rotr(w[i - 15], 18) ^ (w[i - 15] >> 3)
+        s1 = _rotr(w[i - 2], 17) ^ _rotr(w[i - 2], 19) ^ (w[i - 2] >> 10)
+        w[i] = (w[i - 16] + s0 + w[i - 7] + s1) & 0xFFFFFFFF
+
+    a, b, c, d, e, f, g, h = state[0], state[1], state[2], state[3], state[4], state[5], state[6], state[7]
+    for i in range(64):
+        s1 = _rotr(e, 6) ^ _rotr(e, 11) ^ _rotr(e, 25)
+        ch = (e & f) ^ (~e & g)
+        t1 = (h + s1 + ch + K[i] + w[i]) & 0xFFFFFFFF
+        s0 = _rotr(a, 2) ^ _rotr(a, 13) ^ _rotr(a, 22)
+        maj = (a & b) ^ (a & c) ^ (b & c)
+        t2 = (s0 + maj) & 0xFFFFFFFF
+        h = g
+        g = f
+        f = e
+        e = (d + t1) & 0xFFFFFFFF
+        d = c
+        c = b
+        b = a
+        a = (t1 + t2) & 0xFFFFFFFF
+
+    state[0] = (state[0] + a) & 0xFFFFFFFF
+    state[1] = (state[1] + b) & 0xFFFFFFFF
+    state[2] = (state[2] + c) & 0xFFFFFFFF
+    state[3] = (state[3] + d) & 0xFFFFFFFF
+    state[4] = (state[4] + e) & 0xFFFFFFFF
+    state[5] = (state[5] + f) & 0xFFFFFFFF
+    state[6] = (state[6] + g) & 0xFFFFFFFF
+    state[7] = (state[7] + h) & 0xFFFFFFFF
+
+
+@njit(cache=True)
+def _rehash_digest(state, w):
+    """Replace state with the SHA-256 of its own 32-byte digest"""
+    for i in range(8):
+        w[i] = state[i]
+    w[8] = 0x80000000  # Padding bit; 32-byte message and length fit one block
+    for i in range(9, 15):
+        w[i] = 0
+    w[15] = 256  # Message length in bits
+    state[:] = H0
+    _compress_words(state, w)
+
+
+@njit(cache=True, inline='always')
+def _leading_zero_nibbles(state, difficulty):
+    """Check the digest in state starts with `difficulty` zero hex digits"""
+    for k in range(difficulty):
+        if (state[k >> 3] >> (28 - 4 * (k & 7))) & 0xF:
+            return False
+    return True
+
+
+@njit(cache=True)
+def mine(midstate, tail, nonce_off, difficulty, start, stop):
+    """
+    Scan nonces in [start, stop) and return the first one whose double
+    SHA-256 meets difficulty
+
+    midstate is the SHA-256 state after the constant prefix blocks, tail
+    holds the remaining padded block(s) with room for the nonce at
+    nonce_off. Returns -1 if no nonce in the range works.
+    """
+    nblocks = tail.shape[0] // 64
+    buf = tail.copy()
+    state = np.empty(8, np.int64)
+    w = np.empty(64, np.int64)
+
+    for nonce in range(start, stop):
+        n = nonce
+        for i in range(NONCE_SIZE):
+            buf[nonce_off + i] = n & 0xFF
+            n >>= 8
+
+        state[:] = midstate
+        for block in range(nblocks):
+            sha256_compress(state, buf, block * 64, w)
+        _rehash_digest(state, w)
+
+        if _leading_zero_nibbles(state, difficulty):
+            return nonce
+
+    return -1
+
+
+@njit(cache=True, inline='always')
+def _compress_lanes(state, w, v):
+    """
+    Compress one block per lane: w[0:16] holds each lane's message words,
+    v is scratch for the working variables
+    """
+    for i in range(16, 64):
+        for lane in range(LANES):
+            x = w[i - 15, lane]
+            y = w[i - 2, lane]
+            s0 = _rotr(x, 7) ^ _rotr(x, 18) ^ (x >> 3)
+            s1 = _rotr(y, 17) ^ _rotr(y, 19) ^ (y >> 10)
+            w[i, lane] = (w[i - 16, lane] + s0 + w[i - 7, lane] + s1) & 0xFFFFFFFF
+
+    for r in range(8):
+        for lane in range(LANES):
+            v[r, lane] = state[r, lane]
+    for i in range(64):
+        for lane in range(LANES):
+            a, b, c, d = v[0, lane], v[1, lane], v[2, lane], v[3, lane]
+            e, f, g, h = v[4, lane], v[5, lane], v[6, lane], v[7, lane]
+            s1 = _rotr(e, 6) ^ _rotr(e, 11) ^ _rotr(e, 25)
+            ch = (e & f) ^ (~e & g)
+            t1 = (h + s1 + ch + K[i] + w[i, lane]) & 0xFFFFFFFF
+            s0 = _rotr(a, 2) ^ _rotr(a, 13) ^ _rotr(a, 22)
+            maj = (a & b) ^ (a & c) ^ (b & c)
+            v[7, lane] = g
+            v[6, lane] = f
+            v[5, lane] = e
+            v[4, lane] = (d + t1) & 0xFFFFFFFF
+            v[3, lane] = c
+            v[2, lane] = b
+            v[1, lane] = a
+            v[0, lane] = (t1 + s0 + maj) & 0xFFFFFFFF
+    for r in range(8):
+        for lane in range(LANES):
+            state[r, lane] = (state[r, lane] + v[r, lane]) & 0xFFFFFFFF
+
+
+@njit(cache=True)
+def mine_multi(midstate, tail, nonce_off, difficulty, start, stop):
+    """
+    Multi-buffer variant of mine: double-hashes LANES consecutive nonces per step
+
+    State and message schedule are stored lane-minor ([word, lane]) so each
+    step of SHA-256 is a short loop over independent lanes. Returns the
+    same (first) nonce as mine, or -1.
+    """
+    nblocks = tail.shape[0] // 64
+
+    # Tail block words with the nonce bytes zeroed, spliced in per step
+    words = np.empty(nblocks * 16, np.int64)
+    for i in range(nblocks * 16):
+        j = 4 * i
+        words[i] = (tail[j] << 24) | (tail[j + 1] << 16) | (tail[j + 2] << 8) | tail[j + 3]
+
+    state = np.empty((8, LANES), np.int64)
+    v = np.empty((8, LANES), np.int64)
+    w = np.empty((64, LANES), np.int64)
+
+    for base in range(start, stop, LANES):
+        for r in range(8):
+            for lane in range(LANES):
+                state[r, lane] = midstate[r]
+
+        for block in range(nblocks):
+            for i in range(16):
+                for lane in range(LANES):
+                    w[i, lane] = words[block * 16 + i]
+            for k in range(NONCE_SIZE):
+                pos = nonce_off + k
+                if pos // 64 == block:
+                    word = (pos % 64) // 4
+                    shift = 24 - 8 * (pos % 4)
+                    for lane in range(LANES):
+                        w[word, lane] |= (((base + lane) >> (8 * k)) & 0xFF) << shift
+
+            _compress_lanes(state, w, v)
+
+        # Second SHA-256 over each lane's 32-byte digest: one block whose
+        # padding words are the same for every lane
+        for i in range(8):
+            for lane in range(LANES):
+                w[i, lane] = state[i, lane]
+        for i in range(8, 16):
+            for lane in range(LANES):
+                w[i, lane] = 0
+        for lane in range(LANES):
+            w[8, lane] = 0x80000000
+            w[15, lane] = 256
+        for r in range(8):
+            for lane in range(LANES):
+                state[r, lane] = H0[r]
+        _compress_lanes(state, w, v)
+
+        # Lanes are checked in order so the lowest winning nonce is returned
+        for lane in range(min(LANES, stop - base)):
+            ok = True
+            for k in range(difficulty):
+                if (state[k >> 3, lane] >> (28 - 4 * (k & 7))) & 0xF:
+                    ok = False
+                    break
+            if ok:
+                return base + lane
+
+    return -1
+
+
+def prepare(prefix: bytes):
+    """
+    Split a header prefix into (midstate, padded tail, nonce offset)
+
+    All full 64-byte blocks of the prefix are compressed here once; the
+    tail is the rest of the prefix, a zeroed nonce slot and SHA-256 padding.
+    """
+    full = len(prefix) // 64 * 64
+    data = np.frombuffer(prefix, dtype=np.uint8).astype(np.int64)
+
+    midstate = H0.copy()
+    w = np.empty(64, np.int64)
+    for offset in range(0, full, 64):
+        sha256_compress(midstate, data, offset, w)
+
+    message_len = len(prefix) + NONCE_SIZE
+    rest = prefix[full:] + bytes(NONCE_SIZE) + b"\x80"
+    rest += bytes(-(len(rest) + 8) % 64) + (message_len * 8).to_bytes(8, "big")
+    tail = np.frombuffer(rest, dtype=np.uint8).astype(np.int64)
+
+    return midstate, tail, len(prefix) - full
+
+
+def find_nonce(prefix: bytes, difficulty: int, start: int, stop: int) -> int:
+    """Find the first nonce in [start, stop) for prefix, or -1"""
+    midstate, tail, nonce_off = prepare(prefix)
+    return mine_multi(midstate, tail, nonce_off, difficulty, start, stop)
@@ -0,0 +1,205 @@
+/*
+ * Double SHA-256 nonce search using Intel SHA Extensions (SHA-NI)
+ *
+ * Same search as mine_kernel.mine: the constant header prefix is compressed
+ * once into a midstate, then only the padded tail block(s) holding the
+ * 4-byte little-endian nonce are compressed per attempt, four rounds per
+ * _mm_sha256rnds2_epu32 pair. The outer SHA-256 of the 32-byte digest is a
+ * single block whose padding words are constants.
+ *
+ * Build (loaded with ctypes by sha_ni.py):
+ *   cc -O3 -msha -mssse3 -shared -fPIC -o _sha256ni.so sha256ni.c
+ */
+
+#include <stdint.h>
+#include <string.h>
+#include <cpuid.h>
+#include <immintrin.h>
+
+static const uint32_t K[64] = {
+    0x428a2f98, 0x71374491, 0xb5c0fbcf, 0xe9b5dba5, 0x3956c25b, 0x59f111f1, 0x923f82a4, 0xab1c5ed5,
+    0xd807aa98, 0x12835b01, 0x243185be, 0x550c7dc3, 0x72be5d74, 0x80deb1fe, 0x9bdc06a7, 0xc19bf174,
+    0xe49b69c1, 0xefbe4786, 0x0fc19dc6, 0x240ca1cc, 0x2de92c6f, 0x4a7484aa, 0x5cb0a9dc, 0x76f988da,
+    0x983e5152, 0xa831c66d, 0xb00327c8, 0xbf597fc7, 0xc6e00bf3, 0xd5a79147, 0x06ca6351, 0x14292967,
+    0x27b70a85, 0x2e1b2138, 0x4d2c6dfc, 0x53380d13, 0x650a7354, 0x766a0abb, 0x81c2c92e, 0x92722c85,
+    0xa2bfe8a1, 0xa81a664b, 0xc24b8b70, 0xc76c51a3, 0xd192e819, 0xd6990624, 0xf40e3585, 0x106aa070,
+    0x19a4c116, 0x1e376c08, 0x2748774c, 0x34b0bcb5, 0x391c0cb3, 0x4ed8aa4a, 0x5b9cca4f, 0x682e6ff3,
+    0x748f82ee, 0x78a5636f, 0x84c87814, 0x8cc70208, 0x90befffa, 0xa4506ceb, 0xbef9a3f7, 0xc67178f2,
+};
+
+static const uint32_t H0[8] = {
+    0x6a09e667, 0xbb67ae85, 0x3c6ef372, 0xa54ff53a, 0x510e527f, 0x9b05688c, 0x1f83d9ab, 0x5be0cd19,
+};
+
+#define NONCE_SIZE 4
+
+/* Returns 1 if the CPU supports the SHA extensions (CPUID.7.0:EBX bit 29) */
+int sha256ni_supported(void)
+{
+    unsigned int eax, ebx, ecx, edx;
+    if (!__get_cpuid_count(7, 0, &eax, &ebx, &ecx, &edx))
+        return 0;
+    return (ebx >> 29) & 1;
+}
+
+/*
+ * Compress one block, given as message words W0..W15 in four vectors, into
+ * state (ABEF/CDGH packed form). msgs is used as the schedule scratch.
+ */
+__attribute__((target("sha,ssse3")))
+static void compress_words(__m128i *abef, __m128i *cdgh, __m128i msgs[4])
+{
+    __m128i state0 = *abef, state1 = *cdgh;
+    __m128i save0 = state0, save1 = state1;
+    __m128i msg;
+
+    for (int i = 0; i < 16; i++) {
+        __m128i *cur = &msgs[i & 3];
+        if (i >= 4) {
+            /* W[t] = ssig1(W[t-2]) + W[t-7] + ssig0(W[t-15]) + W[t-16] */
+            __m128i tmp = _mm_alignr_epi8(msgs[(i - 1) & 3], msgs[(i - 2) & 3], 4);
+            *cur = _mm_sha256msg1_epu32(*cur, msgs[(i - 3) & 3]);
+            *cur = _mm_add_epi32(*cur, tmp);
+            *cur = _mm_sha256msg2_epu32(*cur, msgs[(i - 1) & 3]);
+        }
+        msg = _mm_add_epi32(*cur, _mm_loadu_si128((const __m128i *)(K + 4 * i)));
+        state1 = _mm_sha256rnds2_epu32(state1, state0, msg);
+        msg = _mm_shuffle_epi32(msg, 0x0E);
+        state0 = _mm_sha256rnds2_epu32(state0, state1, msg);
+    }
+
+    *abef = _mm_add_epi32(state0, save0);
+    *cdgh = _mm_add_epi32(state1, save1);
+}
+
+/* Compress one 64-byte block into state (ABEF/CDGH packed form) */
+__attribute__((target("sha,ssse3")))
+static void compress(__m128i *abef, __m128i *cdgh, const uint8_t *block)
+{
+    const __m128i shuf = _mm_set_epi64x(0x0c0d0e0f08090a0bULL, 0x0405060700010203ULL);
+    __m128i msgs[4];
+
+    for (int i = 0; i < 4; i++)
+        msgs[i] = _mm_shuffle_epi8(_mm_loadu_si128((const __m128i *)(block + 16 * i)), shuf);
+    compress_words(abef, cdgh, msgs);
+}
+
+/*
+ * Replace state with SHA-256(digest of state): the 32-byte message, 0x80
+ * and the 256-bit length fill exactly one block, so only W0..W7 vary
+ */
+__attribute__((target("sha,ssse3")))
+static void rehash_digest(__m128i *abef, __m128i *cdgh)
+{
+    __m128i msgs[4];
+
+    /* [F E B A] / [H G D C] lanes -> W0..3 = A B C D, W4..7 = E F G H */
+    msgs[0] = _mm_shuffle_epi32(_mm_unpackhi_epi32(*abef, *cdgh), 0x72);
+    msgs[1] = _mm_shuffle_epi32(_mm_unpacklo_epi32(*abef, *cdgh), 0x72);
+    msgs[2] = _mm_set_epi32(0, 0, 0, (int)0x80000000);
+    msgs[3] = _mm_set_epi32(256, 0, 0, 0);
+
+    *abef = _mm_set_epi32(H0[0], H0[1], H0[4], H0[5]);
+    *cdgh = _mm_set_epi32(H0[2], H0[3], H0[6], H0[7]);
+    compress_words(abef, cdgh, msgs);
+}
+
+/* Compress one 64-byte block into state[8] (a..h word order) in place */
+__attribute__((target("sha,ssse3")))
+void sha256ni_compress(uint32_t state[8], const uint8_t block[64])
+{
+    __m128i abef = _mm_set_epi32(state[0], state[1], state[4], state[5]);
+    __m128i cdgh = _mm_set_epi32(state[2], state[3], state[6], state[7]);
+    uint32_t packed[8];
+
+    compress(&abef, &cdgh, block);
+    _mm_storeu_si128((__m128i *)packed, abef);
+    _mm_storeu_si128((__m128i *)(packed + 4), cdgh);
+    state[0] = packed[3]; state[1] = packed[2]; state[2] = packed[7]; state[3] = packed[6];
+    state[4] = packed[1]; state[5] = packed[0]; state[6] = packed[5]; state[7] = packed[4];
+}
+
+/* Check the first `difficulty` hex digits of the digest are zero */
+static int leading_zero_nibbles(__m128i abef, __m128i cdgh, int difficulty)
+{
+    uint32_t packed[8], words[8];
+    _mm_storeu_si128((__m128i *)packed, abef);       /* F E B A */
+    _mm_storeu_si128((__m128i *)(packed + 4), cdgh); /* H G D C */
+    words[0] = packed[3]; words[1] = packed[2]; words[2] = packed[7]; words[3] = packed[6];
+    words[4] = packed[1]; words[5] = packed[0]; words[6] = packed[5]; words[7] = packed[4];
+
+    for (int k = 0; k < difficulty; k++)
+        if ((words[k >> 3] >> (28 - 4 * (k & 7))) & 0xF)
+            return 0;
+    return 1;
+}
+
+/*
+ * Hash n independent 64-byte messages from in, writing n 32-byte digests
+ * to out (a Merkle level: each message is a pair of child digests). All
+ * messages are one block long, so they share the same padding block.
+ */
+__attribute__((target("sha,ssse3")))
+void sha256ni_hash64(const uint8_t *in, size_t n, uint8_t *out)
+{
+    const __m128i h_abef = _mm_set_epi32(H0[0], H0[1], H0[4], H0[5]);
+    const __m128i h_cdgh = _mm_set_epi32(H0[2], H0[3], H0[6], H0[7]);
+    uint32_t packed[8], words[8];
+    uint8_t pad[64] = {0x80};
+    pad[62] = 0x02; /* 512-bit message length */
+
+    for (size_t m = 0; m < n; m++) {
+        __m128i abef = h_abef, cdgh = h_cdgh;
+        compress(&abef, &cdgh, in + 64 * m);
+        compress(&abef, &cdgh, pad);
+
+        _mm_storeu_si128((__m128i *)packed, abef);
+        _mm_storeu_si128((__m128i *)(packed + 4), cdgh);
+        words[0] = packed[3]; words[1] = packed[2]; words[2] = packed[7]; words[3] = packed[6];
+        words[4] = packed[1]; words[5] = packed[0]; words[6] = packed[5]; words[7] = packed[4];
+        for (int i = 0; i < 32; i++)
+            out[32 * m + i] = (uint8_t)(words[i >> 2] >> (24 - 8 * (i & 3)));
+    }
+}
+
+/*
+ * Scan nonces in [start, stop) for prefix || nonce and return the first one
+ * whose double SHA-256 has `difficulty` leading zero hex digits, or -1
+ */
+__attribute__((target("sha,ssse3")))
+int64_t sha256ni_scan(const uint8_t *prefix, size_t len, int difficulty, uint64_t start, uint64_t stop)
+{
+    size_t full = len / 64 * 64;
+    size_t rest = len - full;
+    uint8_t tail[128];
+    size_t tail_len = (rest + NONCE_SIZE + 9 <= 64) ? 64 : 128;
+    uint64_t bits = (uint64_t)(len + NONCE_SIZE) * 8;
+
+    /* Pack H0 into ABEF/CDGH and absorb the constant prefix blocks */
+    __m128i abef = _mm_set_epi32(H0[0], H0[1], H0[4], H0[5]);
+    __m128i cdgh = _mm_set_epi32(H0[2], H0[3], H0[6], H0[7]);
+    for (size_t off = 0; off < full; off += 64)
+        compress(&abef, &cdgh, prefix + off);
+
+    /* Tail: rest of prefix, nonce slot, 0x80, zero pad, big-endian bit length */
+    memset(tail, 0, sizeof(tail));
+    memcpy(tail, prefix + full, rest);
+    tail[rest + NONCE_SIZE] = 0x80;
+    for (int i = 0; i < 8; i++)
+        tail[tail_len - 1 - i] = (uint8_t)(bits >> (8 * i));
+
+    for (uint64_t nonce = start; nonce < stop; nonce++) {
+        __m128i s0 = abef, s1 = cdgh;
+        for (int i = 0; i < NONCE_SIZE; i++)
+            tail[rest + i] = (uint8_t)(nonce >> (8 * i));
+
+        compress(&s0, &s1, tail);
+        if (tail_len == 128)
+            compress(&s0, &s1, tail + 64);
+        rehash_digest(&s0, &s1);
+
+        if (leading_zero_nibbles(s0, s1, difficulty))
+            return (int64_t)nonce;
+    }
+    return -1;
+}
@@ -0,0 +1,53 @@
+"""
+Double SHA-256 nonce search on Intel SHA Extensions (SHA-NI)
+Thin ctypes wrapper around sha256ni.c. Build the library next to this file:
+
+    cc -O3 -msha -mssse3 -shared -fPIC -o _sha256ni.so sha256ni.c
+
+Importing raises ImportError if the library hasn't been built or the CPU
+lacks the SHA extensions; simple_bitcoin then falls back to mine_kernel or
+hashlib.
+"""
+
+import ctypes
+import os
+
+
+_LIB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "_sha256ni.so")
+
+try:
+    _lib = ctypes.CDLL(_LIB_PATH)
+except OSError as e:
+    raise ImportError(f"SHA-NI library not built ({_LIB_PATH})") from e
+
+if not _lib.sha256ni_supported():
+    raise ImportError("CPU does not support SHA extensions")
+
+_lib.sha256ni_compress.argtypes = [ctypes.POINTER(ctypes.c_uint32), ctypes.c_char_p]
+_lib.sha256ni_compress.restype = None
+_lib.sha256ni_scan.argtypes = [
+    ctypes.c_char_p, ctypes.c_size_t, ctypes.c_int, ctypes.c_uint64, ctypes.c_uint64,
+]
+_lib.sha256ni_scan.restype = ctypes.c_int64
+_lib.sha256ni_hash64.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_void_p]
+_lib.sha256ni_hash64.restype = None
+
+
+def compress(state, block: bytes):
+    """Compress one 64-byte block into the 8-word SHA-256 state, returns the new state"""
+    if len(block) != 64:
+        raise ValueError("block must be 64 bytes")
+    words = (ctypes.c_uint32 * 8)(*state)
+    _lib.sha256ni_compress(words, block)
+    return list(words)
+
+
+def hash_pairs_into(tree: bytearray, in_off: int, count: int, out_off: int):
+    """SHA-256 count 64-byte chunks of tree from in_off, writing the digests at out_off"""
+    base = ctypes.addressof((ctypes.c_char * len(tree)).from_buffer(tree))
+    _lib.sha256ni_hash64(base + in_off, count, base + out_off)
+
+
+def find_nonce(prefix: bytes, difficulty: int, start: int, stop: int) -> int:
+    """Find the first nonce in [start, stop) for prefix, or -1"""
+    return _lib.sha256ni_scan(prefix, len(prefix), difficulty, start, stop)
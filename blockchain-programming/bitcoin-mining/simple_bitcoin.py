@@ -11,38 +11,212 @@ This is educational code to understand Bitcoin's core mechanics
 """
 
 import hashlib
+import multiprocessing
+import os
+import queue
+import struct
 import time
-import json
+from collections import defaultdict
 from typing import List, Dict, Optional
-from dataclasses import dataclass, asdict
 from datetime import datetime
 
+# All-zero hash, used for the empty Merkle root and the genesis previous_hash
+ZERO_HASH_HEX = "0" * 64
+ZERO_HASH_BYTES = bytes(32)
+
+# Block header, laid out like Bitcoin's 80-byte header: index (in the
+# version slot), previous hash, Merkle root, timestamp, difficulty (in the
+# bits slot), then the 4-byte little-endian nonce
+HEADER_FORMAT = struct.Struct('<I32s32sII')
+NONCE_FORMAT = struct.Struct('<I')
+NONCE_LIMIT = 1 << 32
+
+# Amounts are integer satoshis, like real Bitcoin
+SAT = 100_000_000  # Satoshis per BTC
+DEFAULT_FEE = 100_000  # 0.001 BTC
+
+# Transaction hash layout: amount and fee as int64 satoshis, timestamp as a
+# double, then the sender and receiver as length-prefixed UTF-8
+TX_FORMAT = struct.Struct('<qqd')
+TX_NAME_FORMAT = struct.Struct('<H')
+
+# Pseudo-senders whose transactions mint the block reward and fee payout
+MINT_SENDERS = frozenset({"coinbase", "fees"})
+
+MAX_MINING_ATTEMPTS = 10_000_000  # 10 million attempts max for demo
+PROGRESS_INTERVAL = 100_000  # Attempts between progress lines
+WORKER_POLL_SECONDS = 1.0  # How often the parallel search checks its workers are alive
+
+try:
+    import mine_kernel  # Optional compiled search (needs numba)
+except ImportError:
+    mine_kernel = None
+
+try:
+    import sha_ni  # Optional hardware SHA-256 search (needs _sha256ni.so and a SHA-NI CPU)
+except ImportError:
+    sha_ni = None
+
+try:
+    import mine_gpu  # Optional CUDA search (needs numba and a CUDA GPU)
+except ImportError:
+    mine_gpu = None
+
+# Below this a CPU search usually finishes before a GPU launch pays off
+GPU_MIN_DIFFICULTY = 7
+# At GPU difficulties a hit takes ~16**difficulty attempts, far past the
+# demo limit, so the GPU search may scan the whole nonce range
+GPU_MAX_MINING_ATTEMPTS = NONCE_LIMIT
+
+# Fastest available CPU nonce search, picked once at import: SHA-NI, then numba
+if sha_ni is not None:
+    find_nonce = sha_ni.find_nonce
+elif mine_kernel is not None:
+    find_nonce = mine_kernel.find_nonce
+else:
+    find_nonce = None
+
+
+def scan_nonces(prefix: bytes, difficulty: int, start: int, stop: int) -> int:
+    """Return the first nonce in [start, stop) meeting difficulty, or -1"""
+    if find_nonce is not None:
+        return find_nonce(prefix, difficulty, start, stop)
+    return scan_nonces_hashlib(prefix, difficulty, start, stop)
+
+
+def scan_nonces_hashlib(prefix: bytes, difficulty: int, start: int, stop: int) -> int:
+    """
+    Pure hashlib version of scan_nonces
+    The loop only hashes and compares; callers report progress between calls.
+    """
+    # Target: hash must start with this many hex zeros, i.e. this many
+    # zero bytes in the raw digest plus one zero high nibble if odd
+    full_bytes = difficulty // 2
+    zero_bytes = ZERO_HASH_BYTES[:full_bytes]
+    half_byte = difficulty & 1
+    
+    # The header prefix is the same for every nonce, so absorb it into the
+    # SHA-256 state once (the "midstate") and only hash the nonce per attempt
+    sha256 = hashlib.sha256
+    midstate = sha256(prefix)
+    
+    # Fixed-width nonce buffer, overwritten in place on every attempt
+    nonce_buf = bytearray(NONCE_FORMAT.size)
+    
+    # Bind everything the loop calls to locals (LOAD_FAST instead of attribute lookups)
+    pack_nonce = NONCE_FORMAT.pack_into
+    fork = midstate.copy
+    
+    for nonce in range(start, stop):
+        pack_nonce(nonce_buf, 0, nonce)
+        sha = fork()
+        sha.update(nonce_buf)
+        digest = sha256(sha.digest()).digest()
+        if digest[:full_bytes] == zero_bytes and (not half_byte or digest[full_bytes] < 0x10):
+            return nonce
+    return -1
+
+
+def hash_pairs_into(tree: bytearray, in_off: int, count: int, out_off: int):
+    """SHA-256 count 64-byte pairs of digests from tree[in_off:], writing the parents at out_off"""
+    if sha_ni is not None:
+        sha_ni.hash_pairs_into(tree, in_off, count, out_off)
+        return
+    
+    sha256 = hashlib.sha256
+    view = memoryview(tree)
+    for i in range(count):
+        tree[out_off + 32 * i:out_off + 32 * i + 32] = sha256(view[in_off + 64 * i:in_off + 64 * i + 64]).digest()
+    view.release()
+
+
+def _mine_worker(prefix, difficulty, first, stop, worker_index, workers, found, results):
+    """
+    Scan every `workers`-th chunk of nonces starting at chunk `worker_index`
+    Posts (winning nonce or None, nonces scanned) to results when done
+    """
+    scanned = 0
+    chunk_start = first + worker_index * PROGRESS_INTERVAL
+    while chunk_start < stop and not found.is_set():
+        chunk_stop = min(chunk_start + PROGRESS_INTERVAL, stop)
+        nonce = scan_nonces(prefix, difficulty, chunk_start, chunk_stop)
+        if nonce >= 0:
+            found.set()
+            results.put((nonce, scanned + nonce - chunk_start + 1))
+            return
+        scanned += chunk_stop - chunk_start
+        chunk_start += workers * PROGRESS_INTERVAL
+    results.put((None, scanned))
+
+
+def hash_to_bytes(value: str) -> bytes:
+    """32 raw bytes for a hash field: the hex itself, or SHA-256 of any other text"""
+    if len(value) == 64:
+        try:
+            return bytes.fromhex(value)
+        except ValueError:
+            pass
+    return hashlib.sha256(value.encode()).digest()
+
+
+def format_btc(sats: int) -> str:
+    """Format a satoshi amount as BTC for display"""
+    return f"{sats / SAT:.8f}"
+
+
+def meets_difficulty(digest: bytes, difficulty: int) -> bool:
+    """Check a raw digest has at least `difficulty` leading zero hex digits"""
+    full_bytes = difficulty // 2
+    if digest[:full_bytes] != ZERO_HASH_BYTES[:full_bytes]:
+        return False
+    return not difficulty & 1 or digest[full_bytes] < 0x10
+
 
-@dataclass
 class Transaction:
     """Represents a Bitcoin transaction"""
-    sender: str
-    receiver: str
-    amount: float
-    fee: float = 0.001  # Transaction fee
-    timestamp: float = None
+    __slots__ = ('sender', 'receiver', 'amount', 'fee', 'timestamp', '_digest', '_digest_key')
     
-    def __post_init__(self):
-        if self.timestamp is None:
-            self.timestamp = time.time()
+    def __init__(self, sender: str, receiver: str, amount: int, fee: int = DEFAULT_FEE, timestamp: float = None):
+        for name, value in (("amount", amount), ("fee", fee)):
+            if not isinstance(value, int):
+                raise TypeError(f"{name} must be an integer number of satoshis, got {value!r}")
+        self.sender = sender
+        self.receiver = receiver
+        self.amount = amount  # Satoshis
+        self.fee = fee  # Transaction fee, satoshis
+        self.timestamp = time.time() if timestamp is None else timestamp
+        # Digest and the fields it was computed from
+        self._digest: Optional[bytes] = None
+        self._digest_key = None
     
-    def to_dict(self) -> Dict:
-        """Convert transaction to dictionary for hashing"""
-        return asdict(self)
+    def __repr__(self) -> str:
+        return (f"Transaction(sender={self.sender!r}, receiver={self.receiver!r}, amount={self.amount!r}, "
+                f"fee={self.fee!r}, timestamp={self.timestamp!r})")
     
     def get_hash(self) -> str:
         """Calculate transaction hash"""
-        tx_string = json.dumps(self.to_dict(), sort_keys=True)
-        return hashlib.sha256(tx_string.encode()).hexdigest()
+        return self.get_digest().hex()
+    
+    def get_digest(self) -> bytes:
+        """Raw 32-byte transaction hash (computed once, recomputed only if a field changes)"""
+        key = (self.sender, self.receiver, self.amount, self.fee, self.timestamp)
+        if key != self._digest_key:
+            sender = self.sender.encode()
+            receiver = self.receiver.encode()
+            tx_bytes = b"".join((
+                TX_FORMAT.pack(self.amount, self.fee, self.timestamp),
+                TX_NAME_FORMAT.pack(len(sender)), sender,
+                TX_NAME_FORMAT.pack(len(receiver)), receiver,
+            ))
+            self._digest = hashlib.sha256(tx_bytes).digest()
+            self._digest_key = key
+        return self._digest
     
     def is_valid(self) -> bool:
         """Basic transaction validation"""
         return (
+            isinstance(self.amount, int) and
+            isinstance(self.fee, int) and
             self.sender != self.receiver and
             self.amount > 0 and
             self.fee >= 0 and
@@ -51,101 +225,242 @@ class Transaction:
         )
 
 
-@dataclass
 class Block:
     """Represents a Bitcoin block"""
-    index: int
-    timestamp: float
-    transactions: List[Transaction]
-    previous_hash: str
-    merkle_root: str
-    nonce: int = 0
-    difficulty: int = 4
-    
-    def __post_init__(self):
-        if not self.merkle_root:
-            self.merkle_root = self.calculate_merkle_root()
+    __slots__ = (
+        'index', 'timestamp', 'transactions', 'previous_hash', 'merkle_root', 'nonce', 'difficulty',
+        '_final_hash', '_final_nonce', '_target', '_header_key', '_header_prefix', '_hash_buf',
+    )
+    
+    def __init__(self, index: int, timestamp: float, transactions: List[Transaction], previous_hash: str,
+                 merkle_root: str, nonce: int = 0, difficulty: int = 4):
+        self.index = index
+        self.timestamp = timestamp
+        self.transactions = transactions
+        self.previous_hash = previous_hash
+        self.nonce = nonce
+        self.difficulty = difficulty
+        # Hash of the mined block and the nonce it was computed for
+        self._final_hash: Optional[str] = None
+        self._final_nonce: Optional[int] = None
+        # Hex prefix a valid hash must start with
+        self._target = "0" * difficulty
+        self.merkle_root = merkle_root or self.calculate_merkle_root()
+        # Packed header, built once; only the nonce at the end changes while mining
+        self._header_key = None
+        self._header_prefix = b""
+        self._hash_buf = bytearray(HEADER_FORMAT.size + NONCE_FORMAT.size)
+        self._build_header()
+    
+    def __repr__(self) -> str:
+        return (f"Block(index={self.index!r}, timestamp={self.timestamp!r}, "
+                f"transactions=<{len(self.transactions)} txs>, previous_hash={self.previous_hash!r}, "
+                f"merkle_root={self.merkle_root!r}, nonce={self.nonce!r}, difficulty={self.difficulty!r})")
     
     def calculate_merkle_root(self) -> str:
         """Calculate Merkle tree root of all transactions"""
         if not self.transactions:
-            return "0" * 64
+            return ZERO_HASH_HEX
         
-        # Simple Merkle root calculation (in production, use proper Merkle tree)
-        tx_hashes = [tx.get_hash() for tx in self.transactions]
+        # Level sizes are known up front (odd levels gain a copy of their last
+        # digest), so the whole tree is one flat buffer: leaves, then each
+        # level of raw 32-byte parents right after the one below it
+        count = len(self.transactions)
+        levels = []
+        while count > 1:
+            levels.append(count)
+            count = (count + 1) // 2
+        tree = bytearray(32 * (sum(n + (n & 1) for n in levels) + 1))
+        tree[:32 * len(self.transactions)] = b"".join(tx.get_digest() for tx in self.transactions)
         
-        while len(tx_hashes) > 1:
-            if len(tx_hashes) % 2 == 1:
-                tx_hashes.append(tx_hashes[-1])  # Duplicate last hash if odd number
-            
-            new_hashes = []
-            for i in range(0, len(tx_hashes), 2):
-                combined = tx_hashes[i] + tx_hashes[i + 1]
-                new_hashes.append(hashlib.sha256(combined.encode()).hexdigest())
-            
-            tx_hashes = new_hashes
+        offset = 0
+        for count in levels:
+            if count & 1:
+                end = offset + 32 * count
+                tree[end:end + 32] = tree[end - 32:end]  # Duplicate last hash if odd number
+                count += 1
+            hash_pairs_into(tree, offset, count // 2, offset + 32 * count)
+            offset += 32 * count
+        
+        return tree[offset:offset + 32].hex()
+    
+    def _header_fields(self) -> tuple:
+        """Header fields, besides the nonce, as a tuple to compare against _header_key"""
+        return (self.index, self.previous_hash, self.merkle_root, self.timestamp, self.difficulty)
+    
+    def _build_header(self):
+        """
+        (Re)pack the header prefix into _hash_buf if any header field changed since the last pack
+        A change also drops the mined hash, which no longer describes this header
+        """
+        key = self._header_fields()
+        if key == self._header_key:
+            return
         
-        return tx_hashes[0] if tx_hashes else "0" * 64
+        self._final_hash = None
+        self._final_nonce = None
+        self._header_prefix = HEADER_FORMAT.pack(
+            self.index,
+            hash_to_bytes(self.previous_hash),
+            hash_to_bytes(self.merkle_root),
+            int(self.timestamp),
+            self.difficulty
+        )
+        self._hash_buf[:HEADER_FORMAT.size] = self._header_prefix
+        self._header_key = key
     
-    def get_block_data(self) -> str:
-        """Get block data for hashing (without nonce)"""
-        return f"{self.index}{self.timestamp}{self.previous_hash}{self.merkle_root}{self.difficulty}"
+    def get_block_data(self) -> bytes:
+        """Get the first 76 bytes of the block header for hashing (without nonce)"""
+        self._build_header()
+        return self._header_prefix
     
     def calculate_hash(self) -> str:
-        """Calculate block hash with current nonce"""
-        block_string = self.get_block_data() + str(self.nonce)
-        return hashlib.sha256(block_string.encode()).hexdigest()
+        """Calculate block hash with current nonce: double SHA-256 of the 80-byte header"""
+        self._build_header()
+        if self._final_hash is not None and self.nonce == self._final_nonce:
+            return self._final_hash
+        
+        NONCE_FORMAT.pack_into(self._hash_buf, HEADER_FORMAT.size, self.nonce)
+        sha256 = hashlib.sha256
+        return sha256(sha256(self._hash_buf).digest()).hexdigest()
     
-    def mine_block(self) -> Dict:
+    def mine_block(self, workers: int = 1) -> Dict:
         """
         Mine the block by finding a nonce that produces a hash with required difficulty
         Returns mining statistics
+        
+        workers > 1 splits the nonce range across that many processes;
+        workers=0 uses one per CPU core
         """
-        target = "0" * self.difficulty  # Target: hash must start with this many zeros
         start_time = time.time()
-        attempts = 0
+        workers = workers or os.cpu_count() or 1
         
         print(f"Mining block {self.index}...")
         print(f"Target difficulty: {self.difficulty} leading zeros")
         print(f"Transactions in block: {len(self.transactions)}")
         
-        while True:
-            attempts += 1
-            hash_result = self.calculate_hash()
-            
-            # Show progress every 100,000 attempts
-            if attempts % 100000 == 0:
-                elapsed = time.time() - start_time
-                hash_rate = attempts / elapsed if elapsed > 0 else 0
-                print(f"   Attempt: {attempts:,} | Hash rate: {hash_rate:,.0f} H/s | Current hash: {hash_result[:20]}...")
-            
-            # Check if we found a valid hash
-            if hash_result.startswith(target):
-                mining_time = time.time() - start_time
-                hash_rate = attempts / mining_time if mining_time > 0 else 0
-                
-                print(f"Block mined successfully!")
-                print(f"Winning hash: {hash_result}")
-                print(f"Winning nonce: {self.nonce}")
-                print(f"Mining time: {mining_time:.2f} seconds")
-                print(f"Hash rate: {hash_rate:,.0f} H/s")
-                print(f"Total attempts: {attempts:,}")
-                
-                return {
-                    'hash': hash_result,
-                    'nonce': self.nonce,
-                    'attempts': attempts,
-                    'mining_time': mining_time,
-                    'hash_rate': hash_rate,
-                    'difficulty': self.difficulty
-                }
-            
-            self.nonce += 1
+        prefix = self.get_block_data()
+        if mine_gpu is not None and self.difficulty >= GPU_MIN_DIFFICULTY:
+            nonce, attempts = self._search_kernel(prefix, start_time, mine_gpu.find_nonce, mine_gpu.WAVE_SIZE,
+                                                  GPU_MAX_MINING_ATTEMPTS)
+        elif workers > 1:
+            nonce, attempts = self._search_parallel(prefix, workers)
+        elif find_nonce is not None:
+            nonce, attempts = self._search_kernel(prefix, start_time)
+        else:
+            nonce, attempts = self._search_hashlib(prefix, start_time)
+        
+        # Safety check to prevent infinite loops in high difficulty
+        if nonce is None:
+            print(f"Stopping after {attempts:,} attempts (demo limit)")
+            return None
+        
+        self.nonce = nonce
+        hash_result = self.calculate_hash()
+        self._final_hash = hash_result
+        self._final_nonce = nonce
+        self._target = "0" * self.difficulty  # Difficulty may have changed since construction
+        mining_time = time.time() - start_time
+        hash_rate = attempts / mining_time if mining_time > 0 else 0
+        
+        print(f"Block mined successfully!")
+        print(f"Winning hash: {hash_result}")
+        print(f"Winning nonce: {self.nonce}")
+        print(f"Mining time: {mining_time:.2f} seconds")
+        print(f"Hash rate: {hash_rate:,.0f} H/s")
+        print(f"Total attempts: {attempts:,}")
+        
+        return {
+            'hash': hash_result,
+            'nonce': self.nonce,
+            'attempts': attempts,
+            'mining_time': mining_time,
+            'hash_rate': hash_rate,
+            'difficulty': self.difficulty
+        }
+    
+    def _search_hashlib(self, prefix: bytes, start_time: float):
+        """
+        Scan nonces from self.nonce with hashlib
+        Returns (winning nonce or None, attempts)
+        """
+        return self._search_kernel(prefix, start_time, scan_nonces_hashlib)
+    
+    def _search_parallel(self, prefix: bytes, workers: int):
+        """
+        Scan nonces from self.nonce across worker processes
+        Workers take interleaved chunks so the winner stays close to the
+        lowest valid nonce; the first hit stops all of them.
+        Returns (winning nonce or None, total attempts); raises
+        RuntimeError if a worker dies without reporting
+        """
+        first = self.nonce
+        stop = min(first + MAX_MINING_ATTEMPTS, NONCE_LIMIT)
+        found = multiprocessing.Event()
+        results = multiprocessing.Queue()
+        
+        processes = [
+            multiprocessing.Process(
+                target=_mine_worker,
+                args=(prefix, self.difficulty, first, stop, i, workers, found, results)
+            )
+            for i in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        
+        # Every worker reports once, either its hit or how much it scanned;
+        # poll so a crashed worker can't leave us waiting forever
+        winner = None
+        attempts = 0
+        reported = 0
+        while reported < len(processes):
+            try:
+                nonce, scanned = results.get(timeout=WORKER_POLL_SECONDS)
+            except queue.Empty:
+                crashed = [process.exitcode for process in processes if process.exitcode not in (None, 0)]
+                if crashed:
+                    found.set()
+                    for process in processes:
+                        process.terminate()
+                        process.join()
+                    raise RuntimeError(f"Mining worker exited with code {crashed[0]} without reporting")
+                continue
+            reported += 1
+            attempts += scanned
+            if nonce is not None and (winner is None or nonce < winner):
+                winner = nonce
+        
+        for process in processes:
+            process.join()
+        
+        return winner, attempts
+    
+    def _search_kernel(self, prefix: bytes, start_time: float, search=None, chunk: int = PROGRESS_INTERVAL,
+                       max_attempts: int = MAX_MINING_ATTEMPTS):
+        """
+        Scan up to max_attempts nonces from self.nonce with a search function, in chunks of `chunk`
+        search defaults to find_nonce (sha_ni or mine_kernel); progress is
+        printed between chunks so the search itself never does I/O
+        Returns (winning nonce or None, attempts)
+        """
+        search = search or find_nonce
+        first = self.nonce
+        stop = min(first + max_attempts, NONCE_LIMIT)
+        
+        for chunk_start in range(first, stop, chunk):
+            chunk_stop = min(chunk_start + chunk, stop)
+            nonce = search(prefix, self.difficulty, chunk_start, chunk_stop)
+            if nonce >= 0:
+                return nonce, nonce - first + 1
             
-            # Safety check to prevent infinite loops in high difficulty
-            if attempts > 10_000_000:  # 10 million attempts max for demo
-                print(f"Stopping after {attempts:,} attempts (demo limit)")
-                break
+            # Show progress after every chunk
+            attempts = chunk_stop - first
+            elapsed = time.time() - start_time
+            hash_rate = attempts / elapsed if elapsed > 0 else 0
+            print(f"   Attempt: {attempts:,} | Hash rate: {hash_rate:,.0f} H/s")
+        
+        return None, stop - first
 
 
 class SimpleBitcoinBlockchain:
@@ -154,10 +469,14 @@ class SimpleBitcoinBlockchain:
     def __init__(self):
         self.chain: List[Block] = []
         self.difficulty = 4  # Number of leading zeros required
-        self.mining_reward = 50.0  # Reward for mining a block
+        self.mining_reward = 50 * SAT  # Reward for mining a block
+        self.mining_workers = 1  # Processes used to mine (0 = one per core)
         self.transaction_pool: List[Transaction] = []  # Mempool
-        self.balances: Dict[str, float] = {
-            "genesis": 1000000.0,  # Genesis account with initial supply
+        # Running mempool totals, kept in step with transaction_pool
+        self._pool_fee_total: int = 0
+        self._pool_amount_by_sender: Dict[str, int] = defaultdict(int)  # Pending amount + fee
+        self.balances: Dict[str, int] = {  # Satoshis
+            "genesis": 1_000_000 * SAT,  # Genesis account with initial supply
         }
         
         # Create genesis block
@@ -168,7 +487,7 @@ class SimpleBitcoinBlockchain:
         genesis_tx = Transaction(
             sender="genesis",
             receiver="miner1", 
-            amount=100.0,
+            amount=100 * SAT,
             timestamp=time.time()
         )
         
@@ -176,13 +495,13 @@ class SimpleBitcoinBlockchain:
             index=0,
             timestamp=time.time(),
             transactions=[genesis_tx],
-            previous_hash="0" * 64,  # Genesis block has no previous hash
+            previous_hash=ZERO_HASH_HEX,  # Genesis block has no previous hash
             merkle_root="",
             difficulty=self.difficulty
         )
         
         print("Creating Genesis Block...")
-        mining_stats = genesis_block.mine_block()
+        mining_stats = genesis_block.mine_block(self.mining_workers)
         self.chain.append(genesis_block)
         
         # Update balances
@@ -200,29 +519,30 @@ class SimpleBitcoinBlockchain:
             print(f"Invalid transaction: {transaction}")
             return False
         
-        # Check if sender has sufficient balance
-        sender_balance = self.balances.get(transaction.sender, 0)
+        # Check if sender has sufficient balance, less what pending transactions already spend
+        available = self.balances.get(transaction.sender, 0) - self._pool_amount_by_sender.get(transaction.sender, 0)
         total_required = transaction.amount + transaction.fee
         
-        if sender_balance < total_required:
-            print(f"Insufficient balance. Required: {total_required}, Available: {sender_balance}")
+        if available < total_required:
+            print(f"Insufficient balance. Required: {format_btc(total_required)}, Available: {format_btc(available)}")
             return False
         
         self.transaction_pool.append(transaction)
-        print(f"Transaction added to mempool: {transaction.sender} -> {transaction.receiver} ({transaction.amount} BTC)")
+        self._pool_fee_total += transaction.fee
+        self._pool_amount_by_sender[transaction.sender] += total_required
+        print(f"Transaction added to mempool: {transaction.sender} -> {transaction.receiver} ({format_btc(transaction.amount)} BTC)")
         return True
     
     def update_balances(self, transactions: List[Transaction]):
         """Update account balances based on transactions"""
+        balances = self.balances
         for tx in transactions:
-            # Deduct from sender
-            if tx.sender in self.balances:
-                self.balances[tx.sender] -= (tx.amount + tx.fee)
+            # Deduct from sender (coinbase and fee payouts create new coins)
+            if tx.sender not in MINT_SENDERS:
+                balances[tx.sender] = balances.get(tx.sender, 0) - (tx.amount + tx.fee)
             
             # Add to receiver
-            if tx.receiver not in self.balances:
-                self.balances[tx.receiver] = 0
-            self.balances[tx.receiver] += tx.amount
+            balances[tx.receiver] = balances.get(tx.receiver, 0) + tx.amount
             
             # Transaction fees go to miner (simplified)
     
@@ -237,18 +557,18 @@ class SimpleBitcoinBlockchain:
             sender="coinbase",
             receiver=miner_address,
             amount=self.mining_reward,
-            fee=0.0,
+            fee=0,
             timestamp=time.time()
         )
         
         # Add transaction fees to mining reward
-        total_fees = sum(tx.fee for tx in self.transaction_pool)
+        total_fees = self._pool_fee_total
         if total_fees > 0:
             fee_tx = Transaction(
                 sender="fees",
                 receiver=miner_address,
                 amount=total_fees,
-                fee=0.0,
+                fee=0,
                 timestamp=time.time()
             )
             transactions = [coinbase_tx, fee_tx] + self.transaction_pool
@@ -260,13 +580,13 @@ class SimpleBitcoinBlockchain:
             index=len(self.chain),
             timestamp=time.time(),
             transactions=transactions,
-            previous_hash=self.get_latest_block().calculate_hash(),
+            previous_hash=self.get_latest_block()._final_hash,
             merkle_root="",
             difficulty=self.difficulty
         )
         
         # Mine the block
-        mining_stats = new_block.mine_block()
+        mining_stats = new_block.mine_block(self.mining_workers)
         
         if mining_stats:
             # Add to blockchain
@@ -277,6 +597,8 @@ class SimpleBitcoinBlockchain:
             
             # Clear transaction pool
             self.transaction_pool = []
+            self._pool_fee_total = 0
+            self._pool_amount_by_sender.clear()
             
             print(f"Block {new_block.index} added to blockchain\n")
             return new_block
@@ -303,27 +625,32 @@ class SimpleBitcoinBlockchain:
             print(f"Difficulty decreased to {self.difficulty}")
     
     def is_chain_valid(self) -> bool:
-        """Validate the entire blockchain"""
-        for i in range(1, len(self.chain)):
-            current_block = self.chain[i]
-            previous_block = self.chain[i - 1]
-            
-            # Check if current block's hash is valid
-            if not current_block.calculate_hash().startswith("0" * current_block.difficulty):
+        """
+        Validate the entire blockchain
+        Uses the hashes stored at mining time, so no block is re-hashed; a
+        block whose header fields changed since it was packed is rejected
+        """
+        previous_hash = ZERO_HASH_HEX
+        for i, block in enumerate(self.chain):
+            # Check the block was mined with its current header and nonce and meets its target
+            mined = (block._final_hash is not None and block.nonce == block._final_nonce
+                     and block._header_fields() == block._header_key)
+            if not mined or not block._final_hash.startswith(block._target):
                 print(f"Invalid hash for block {i}")
                 return False
             
             # Check if previous hash matches
-            if current_block.previous_hash != previous_block.calculate_hash():
+            if block.previous_hash != previous_hash:
                 print(f"Previous hash mismatch at block {i}")
                 return False
+            previous_hash = block._final_hash
         
         print("Blockchain is valid")
         return True
     
-    def get_balance(self, address: str) -> float:
-        """Get account balance"""
-        return self.balances.get(address, 0.0)
+    def get_balance(self, address: str) -> int:
+        """Get account balance in satoshis"""
+        return self.balances.get(address, 0)
     
     def print_blockchain_info(self):
         """Print blockchain statistics"""
@@ -337,7 +664,7 @@ class SimpleBitcoinBlockchain:
         print("\nACCOUNT BALANCES:")
         for address, balance in self.balances.items():
             if balance > 0:
-                print(f"   {address}: {balance:.6f} BTC")
+                print(f"   {address}: {format_btc(balance)} BTC")
         
         print(f"\nRECENT BLOCKS:")
         for block in self.chain[-3:]:  # Show last 3 blocks
@@ -357,9 +684,9 @@ def demo_bitcoin_mining():
     
     # Add some transactions
     print("Adding transactions to mempool...")
-    blockchain.add_transaction(Transaction("miner1", "alice", 25.0, fee=0.001))
-    blockchain.add_transaction(Transaction("miner1", "bob", 15.0, fee=0.002))
-    blockchain.add_transaction(Transaction("alice", "charlie", 10.0, fee=0.001))
+    blockchain.add_transaction(Transaction("miner1", "alice", 25 * SAT, fee=100_000))
+    blockchain.add_transaction(Transaction("miner1", "bob", 15 * SAT, fee=200_000))
+    blockchain.add_transaction(Transaction("alice", "charlie", 10 * SAT, fee=100_000))
     
     # Mine first block
     print("\nMining Block 1...")
@@ -368,8 +695,8 @@ def demo_bitcoin_mining():
     
     # Add more transactions
     print("\nAdding more transactions...")
-    blockchain.add_transaction(Transaction("bob", "alice", 5.0, fee=0.001))
-    blockchain.add_transaction(Transaction("charlie", "bob", 3.0, fee=0.002))
+    blockchain.add_transaction(Transaction("bob", "alice", 5 * SAT, fee=100_000))
+    blockchain.add_transaction(Transaction("charlie", "bob", 3 * SAT, fee=200_000))
     
     # Mine second block
     print("\nMining Block 2...")
@@ -377,7 +704,7 @@ def demo_bitcoin_mining():
     
     # Adjust difficulty and mine another block
     blockchain.adjust_difficulty()
-    blockchain.add_transaction(Transaction("alice", "dave", 8.0, fee=0.001))
+    blockchain.add_transaction(Transaction("alice", "dave", 8 * SAT, fee=100_000))
     
     print("\nMining Block 3...")
     blockchain.mine_block("miner1")
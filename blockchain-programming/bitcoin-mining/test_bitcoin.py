@@ -3,9 +3,14 @@ Test suite for Simple Bitcoin Mining Simulation
 Demonstrates testing blockchain applications and core concepts validation
 """
 
+import hashlib
+import struct
 import unittest
 import time
-from simple_bitcoin import Transaction, Block, SimpleBitcoinBlockchain
+from simple_bitcoin import (
+    Transaction, Block, SimpleBitcoinBlockchain, meets_difficulty, ZERO_HASH_HEX, SAT,
+    mine_kernel, sha_ni, mine_gpu, find_nonce,
+)
 
 
 class TestTransaction(unittest.TestCase):
@@ -13,45 +18,57 @@ class TestTransaction(unittest.TestCase):
     
     def setUp(self):
         """Set up test fixtures"""
-        self.valid_tx = Transaction("alice", "bob", 10.0, fee=0.001)
+        self.valid_tx = Transaction("alice", "bob", 10 * SAT, fee=100_000)
     
     def test_transaction_creation(self):
         """Test transaction creation with valid data"""
         self.assertEqual(self.valid_tx.sender, "alice")
         self.assertEqual(self.valid_tx.receiver, "bob")
-        self.assertEqual(self.valid_tx.amount, 10.0)
-        self.assertEqual(self.valid_tx.fee, 0.001)
+        self.assertEqual(self.valid_tx.amount, 10 * SAT)
+        self.assertEqual(self.valid_tx.fee, 100_000)
         self.assertIsNotNone(self.valid_tx.timestamp)
     
     def test_transaction_hash(self):
         """Test transaction hashing is deterministic"""
-        tx1 = Transaction("alice", "bob", 10.0, fee=0.001, timestamp=1234567890)
-        tx2 = Transaction("alice", "bob", 10.0, fee=0.001, timestamp=1234567890)
+        tx1 = Transaction("alice", "bob", 10 * SAT, fee=100_000, timestamp=1234567890)
+        tx2 = Transaction("alice", "bob", 10 * SAT, fee=100_000, timestamp=1234567890)
         
         # Same transactions should have same hash
         self.assertEqual(tx1.get_hash(), tx2.get_hash())
         
         # Different transactions should have different hashes
-        tx3 = Transaction("alice", "bob", 11.0, fee=0.001, timestamp=1234567890)
+        tx3 = Transaction("alice", "bob", 11 * SAT, fee=100_000, timestamp=1234567890)
         self.assertNotEqual(tx1.get_hash(), tx3.get_hash())
+        
+        # Moving characters between sender and receiver changes the hash
+        tx4 = Transaction("alic", "ebob", 10 * SAT, fee=100_000, timestamp=1234567890)
+        self.assertNotEqual(tx1.get_hash(), tx4.get_hash())
     
     def test_transaction_validation(self):
         """Test transaction validation rules"""
         # Valid transaction
-        valid_tx = Transaction("alice", "bob", 10.0, fee=0.001)
+        valid_tx = Transaction("alice", "bob", 10 * SAT, fee=100_000)
         self.assertTrue(valid_tx.is_valid())
         
         # Invalid: same sender and receiver
-        invalid_tx1 = Transaction("alice", "alice", 10.0, fee=0.001)
+        invalid_tx1 = Transaction("alice", "alice", 10 * SAT, fee=100_000)
         self.assertFalse(invalid_tx1.is_valid())
         
         # Invalid: negative amount
-        invalid_tx2 = Transaction("alice", "bob", -10.0, fee=0.001)
+        invalid_tx2 = Transaction("alice", "bob", -10 * SAT, fee=100_000)
         self.assertFalse(invalid_tx2.is_valid())
         
         # Invalid: empty sender
-        invalid_tx3 = Transaction("", "bob", 10.0, fee=0.001)
+        invalid_tx3 = Transaction("", "bob", 10 * SAT, fee=100_000)
         self.assertFalse(invalid_tx3.is_valid())
+        
+        # Amounts and fees are integer satoshis, not BTC floats
+        with self.assertRaises(TypeError):
+            Transaction("alice", "bob", 1.5)
+        with self.assertRaises(TypeError):
+            Transaction("alice", "bob", 10 * SAT, fee=0.001)
+        valid_tx.amount = 1.5
+        self.assertFalse(valid_tx.is_valid())
 
 
 class TestBlock(unittest.TestCase):
@@ -60,8 +77,8 @@ class TestBlock(unittest.TestCase):
     def setUp(self):
         """Set up test fixtures"""
         self.transactions = [
-            Transaction("alice", "bob", 10.0, fee=0.001, timestamp=1234567890),
-            Transaction("bob", "charlie", 5.0, fee=0.001, timestamp=1234567891)
+            Transaction("alice", "bob", 10 * SAT, fee=100_000, timestamp=1234567890),
+            Transaction("bob", "charlie", 5 * SAT, fee=100_000, timestamp=1234567891)
         ]
         
         self.test_block = Block(
@@ -90,6 +107,14 @@ class TestBlock(unittest.TestCase):
         block1 = Block(1, 1234567890, self.transactions, "prev_hash", "", difficulty=1)
         block2 = Block(1, 1234567890, self.transactions, "prev_hash", "", difficulty=1)
         self.assertEqual(block1.merkle_root, block2.merkle_root)
+        
+        # Odd leaf counts pair the last digest with itself
+        txs = self.transactions + [Transaction("carol", "dave", SAT, timestamp=1234567893)]
+        a, b, c = (tx.get_digest() for tx in txs)
+        left = hashlib.sha256(a + b).digest()
+        right = hashlib.sha256(c + c).digest()
+        expected = hashlib.sha256(left + right).hexdigest()
+        self.assertEqual(Block(1, 1234567890, txs, "prev_hash", "", difficulty=1).merkle_root, expected)
     
     def test_block_hashing(self):
         """Test block hashing"""
@@ -103,6 +128,22 @@ class TestBlock(unittest.TestCase):
         hash3 = self.test_block.calculate_hash()
         self.assertNotEqual(hash1, hash3)
     
+    def test_block_header_layout(self):
+        """Test blocks hash an 80-byte header with double SHA-256"""
+        header = self.test_block.get_block_data() + struct.pack('<I', self.test_block.nonce)
+        self.assertEqual(len(header), 80)
+        
+        expected = hashlib.sha256(hashlib.sha256(header).digest()).hexdigest()
+        self.assertEqual(self.test_block.calculate_hash(), expected)
+        
+        # Non-hex previous hashes still fill the 32-byte field
+        self.assertEqual(len(Block(1, 1234567890, self.transactions, "prev_hash", "").get_block_data()), 76)
+        
+        # The cached header is repacked when a header field changes
+        self.test_block.difficulty = 3
+        self.assertEqual(self.test_block.get_block_data()[-4:], struct.pack('<I', 3))
+        self.assertNotEqual(self.test_block.calculate_hash(), expected)
+    
     def test_mining_with_low_difficulty(self):
         """Test mining with low difficulty"""
         # Use very low difficulty for fast testing
@@ -114,6 +155,23 @@ class TestBlock(unittest.TestCase):
         self.assertTrue(mining_stats['hash'].startswith("0"))
         self.assertGreater(mining_stats['attempts'], 0)
         self.assertGreater(mining_stats['hash_rate'], 0)
+    
+    def test_mined_hash_is_cached(self):
+        """Test the mined hash is reused until the nonce changes"""
+        self.test_block.difficulty = 1
+        mining_stats = self.test_block.mine_block()
+        
+        self.assertEqual(self.test_block._final_hash, mining_stats['hash'])
+        self.assertEqual(self.test_block.calculate_hash(), mining_stats['hash'])
+        
+        self.test_block.nonce += 1
+        self.assertNotEqual(self.test_block.calculate_hash(), mining_stats['hash'])
+        
+        # Any other header change drops the cached hash, even at the mined nonce
+        self.test_block.nonce = mining_stats['nonce']
+        self.test_block.previous_hash = "1" * 64
+        self.assertNotEqual(self.test_block.calculate_hash(), mining_stats['hash'])
+        self.assertIsNone(self.test_block._final_hash)
 
 
 class TestSimpleBitcoinBlockchain(unittest.TestCase):
@@ -139,7 +197,7 @@ class TestSimpleBitcoinBlockchain(unittest.TestCase):
         self.assertGreater(initial_balance, 0)
         
         # Add transaction
-        tx = Transaction("miner1", "alice", 10.0, fee=0.001)
+        tx = Transaction("miner1", "alice", 10 * SAT, fee=100_000)
         success = self.blockchain.add_transaction(tx)
         self.assertTrue(success)
         
@@ -149,22 +207,22 @@ class TestSimpleBitcoinBlockchain(unittest.TestCase):
     def test_transaction_validation(self):
         """Test transaction validation in blockchain context"""
         # Valid transaction with sufficient balance
-        valid_tx = Transaction("miner1", "alice", 10.0, fee=0.001)
+        valid_tx = Transaction("miner1", "alice", 10 * SAT, fee=100_000)
         self.assertTrue(self.blockchain.add_transaction(valid_tx))
         
         # Invalid transaction with insufficient balance
-        invalid_tx = Transaction("miner1", "alice", 999999.0, fee=0.001)
+        invalid_tx = Transaction("miner1", "alice", 999999 * SAT, fee=100_000)
         self.assertFalse(self.blockchain.add_transaction(invalid_tx))
         
         # Invalid transaction structure
-        malformed_tx = Transaction("", "alice", 10.0, fee=0.001)
+        malformed_tx = Transaction("", "alice", 10 * SAT, fee=100_000)
         self.assertFalse(self.blockchain.add_transaction(malformed_tx))
     
     def test_mining_process(self):
         """Test block mining process"""
         # Add transactions to mine
-        self.blockchain.add_transaction(Transaction("miner1", "alice", 10.0, fee=0.001))
-        self.blockchain.add_transaction(Transaction("miner1", "bob", 5.0, fee=0.002))
+        self.blockchain.add_transaction(Transaction("miner1", "alice", 10 * SAT, fee=100_000))
+        self.blockchain.add_transaction(Transaction("miner1", "bob", 5 * SAT, fee=200_000))
         
         initial_chain_length = len(self.blockchain.chain)
         initial_mempool_size = len(self.blockchain.transaction_pool)
@@ -180,6 +238,7 @@ class TestSimpleBitcoinBlockchain(unittest.TestCase):
         # Verify miner received reward
         miner_balance = self.blockchain.get_balance("miner2")
         self.assertGreater(miner_balance, self.blockchain.mining_reward)  # Reward + fees
+        self.assertEqual(miner_balance, self.blockchain.mining_reward + 300_000)  # Integer fees add up exactly
     
     def test_blockchain_validation(self):
         """Test blockchain integrity validation"""
@@ -188,11 +247,30 @@ class TestSimpleBitcoinBlockchain(unittest.TestCase):
         
         # Mine a few blocks
         for i in range(2):
-            self.blockchain.add_transaction(Transaction("miner1", f"user{i}", 5.0, fee=0.001))
+            self.blockchain.add_transaction(Transaction("miner1", f"user{i}", 5 * SAT, fee=100_000))
             self.blockchain.mine_block(f"miner{i}")
         
         # Should still be valid
         self.assertTrue(self.blockchain.is_chain_valid())
+        
+        # Changing a mined nonce or relinking a block breaks the chain
+        self.blockchain.chain[1].nonce += 1
+        self.assertFalse(self.blockchain.is_chain_valid())
+        self.blockchain.chain[1].nonce -= 1
+        self.blockchain.chain[2].previous_hash = ZERO_HASH_HEX
+        self.assertFalse(self.blockchain.is_chain_valid())
+    
+    def test_tampered_block_is_invalid(self):
+        """Test editing a mined block's transactions invalidates the chain"""
+        self.blockchain.add_transaction(Transaction("miner1", "alice", 5 * SAT, fee=100_000))
+        self.blockchain.mine_block("miner2")
+        self.assertTrue(self.blockchain.is_chain_valid())
+        
+        # Inflate a transaction and recompute the Merkle root to match
+        block = self.blockchain.chain[-1]
+        block.transactions[0].amount = 500 * SAT
+        block.merkle_root = block.calculate_merkle_root()
+        self.assertFalse(self.blockchain.is_chain_valid())
     
     def test_difficulty_adjustment(self):
         """Test difficulty adjustment mechanism"""
@@ -200,7 +278,7 @@ class TestSimpleBitcoinBlockchain(unittest.TestCase):
         
         # Need at least 10 blocks for adjustment
         for i in range(12):
-            self.blockchain.add_transaction(Transaction("genesis", f"user{i}", 1.0, fee=0.001))
+            self.blockchain.add_transaction(Transaction("genesis", f"user{i}", SAT, fee=100_000))
             self.blockchain.mine_block(f"miner{i % 3}")
         
         # Difficulty should have been adjusted
@@ -215,14 +293,39 @@ class TestSimpleBitcoinBlockchain(unittest.TestCase):
         initial_balance = self.blockchain.get_balance("miner1")
         
         # Try to spend more than available
-        large_amount = initial_balance + 100
-        double_spend_tx = Transaction("miner1", "alice", large_amount, fee=0.001)
+        large_amount = initial_balance + 100 * SAT
+        double_spend_tx = Transaction("miner1", "alice", large_amount, fee=100_000)
         
         # Should be rejected
         self.assertFalse(self.blockchain.add_transaction(double_spend_tx))
         
         # Balance should remain unchanged
         self.assertEqual(self.blockchain.get_balance("miner1"), initial_balance)
+    
+    def test_rewards_do_not_debit_pseudo_senders(self):
+        """Test coinbase and fee payouts credit the miner without creating debtor accounts"""
+        self.blockchain.add_transaction(Transaction("miner1", "alice", 10 * SAT, fee=SAT // 2))
+        self.blockchain.mine_block("miner2")
+        
+        self.assertEqual(self.blockchain.get_balance("miner2"), self.blockchain.mining_reward + SAT // 2)
+        self.assertNotIn("coinbase", self.blockchain.balances)
+        self.assertNotIn("fees", self.blockchain.balances)
+    
+    def test_pending_spends_are_reserved(self):
+        """Test queued transactions can't together spend more than the balance"""
+        balance = self.blockchain.get_balance("miner1")
+        
+        self.assertTrue(self.blockchain.add_transaction(Transaction("miner1", "alice", balance - SAT, fee=SAT // 2)))
+        self.assertFalse(self.blockchain.add_transaction(Transaction("miner1", "bob", SAT, fee=SAT // 2)))
+        
+        # Rejected senders don't get a reservation entry
+        self.assertFalse(self.blockchain.add_transaction(Transaction("nobody", "bob", SAT)))
+        self.assertNotIn("nobody", self.blockchain._pool_amount_by_sender)
+        
+        # Reservations are released once the pool is mined
+        self.blockchain.mine_block("miner2")
+        self.assertEqual(self.blockchain.get_balance("miner1"), SAT // 2)
+        self.assertTrue(self.blockchain.add_transaction(Transaction("miner1", "bob", 4 * SAT // 10, fee=SAT // 10)))
 
 
 class TestCryptographicOperations(unittest.TestCase):
@@ -230,7 +333,7 @@ class TestCryptographicOperations(unittest.TestCase):
     
     def test_hash_determinism(self):
         """Test that hashes are deterministic"""
-        tx = Transaction("alice", "bob", 10.0, fee=0.001, timestamp=1234567890)
+        tx = Transaction("alice", "bob", 10 * SAT, fee=100_000, timestamp=1234567890)
         
         hash1 = tx.get_hash()
         hash2 = tx.get_hash()
@@ -240,8 +343,8 @@ class TestCryptographicOperations(unittest.TestCase):
     
     def test_hash_avalanche_effect(self):
         """Test that small changes produce very different hashes"""
-        tx1 = Transaction("alice", "bob", 10.0, fee=0.001, timestamp=1234567890)
-        tx2 = Transaction("alice", "bob", 10.1, fee=0.001, timestamp=1234567890)  # Tiny change
+        tx1 = Transaction("alice", "bob", 10 * SAT, fee=100_000, timestamp=1234567890)
+        tx2 = Transaction("alice", "bob", 10 * SAT + SAT // 10, fee=100_000, timestamp=1234567890)  # Tiny change
         
         hash1 = tx1.get_hash()
         hash2 = tx2.get_hash()
@@ -257,7 +360,7 @@ class TestCryptographicOperations(unittest.TestCase):
         block = Block(
             index=1,
             timestamp=time.time(),
-            transactions=[Transaction("alice", "bob", 10.0)],
+            transactions=[Transaction("alice", "bob", 10 * SAT)],
             previous_hash="test_hash",
             merkle_root="",
             difficulty=2
@@ -275,6 +378,75 @@ class TestCryptographicOperations(unittest.TestCase):
         # Verify the proof of work
         final_hash = block.calculate_hash()
         self.assertEqual(final_hash, mining_stats['hash'])
+    
+    def test_parallel_mining(self):
+        """Test mining split across worker processes finds a valid nonce"""
+        block = Block(1, 1234567890, [Transaction("alice", "bob", 10 * SAT, timestamp=1234567890)], "prev_hash", "", difficulty=3)
+        
+        mining_stats = block.mine_block(workers=2)
+        
+        self.assertIsNotNone(mining_stats)
+        self.assertTrue(mining_stats['hash'].startswith("000"))
+        self.assertEqual(block.calculate_hash(), mining_stats['hash'])
+    
+    def test_parallel_mining_worker_crash(self):
+        """Test the parallel search fails instead of hanging when a worker dies"""
+        block = Block(1, 1234567890, [Transaction("alice", "bob", 10 * SAT, timestamp=1234567890)], "prev_hash", "", difficulty=3)
+        
+        # A prefix the workers can't hash makes each of them raise
+        with self.assertRaises(RuntimeError):
+            block._search_parallel(None, 2)
+    
+    def test_digest_difficulty_matches_hex_prefix(self):
+        """Test raw digest difficulty check agrees with leading hex zeros"""
+        digests = [bytes.fromhex(h.ljust(64, "f")) for h in ["", "0", "00", "000", "0000f", "00001"]]
+        
+        for digest in digests:
+            for difficulty in range(0, 6):
+                expected = digest.hex().startswith("0" * difficulty)
+                self.assertEqual(meets_difficulty(digest, difficulty), expected)
+
+
+@unittest.skipIf(find_nonce is None, "no compiled nonce search available")
+class TestMiningKernel(unittest.TestCase):
+    """Test the compiled nonce search against hashlib"""
+    
+    def test_kernel_matches_hashlib(self):
+        """Test kernel and hashlib searches find the same winning nonce"""
+        block = Block(1, 1234567890, [Transaction("alice", "bob", 10 * SAT, timestamp=1234567890)], "prev_hash", "", difficulty=3)
+        prefix = block.get_block_data()
+        
+        kernel_nonce, kernel_attempts = block._search_kernel(prefix, time.time())
+        hashlib_nonce, hashlib_attempts = block._search_hashlib(prefix, time.time())
+        
+        self.assertEqual(kernel_nonce, hashlib_nonce)
+        self.assertEqual(kernel_attempts, hashlib_attempts)
+    
+    @unittest.skipIf(mine_kernel is None, "numba not installed")
+    def test_single_lane_kernel_matches_multi_lane(self):
+        """Test mine and mine_multi agree across tail block layouts"""
+        for length in (10, 55, 56, 64, 120):
+            midstate, tail, nonce_off = mine_kernel.prepare(bytes(range(length)))
+            self.assertEqual(
+                mine_kernel.mine(midstate, tail, nonce_off, 2, 0, 100000),
+                mine_kernel.mine_multi(midstate, tail, nonce_off, 2, 0, 100000)
+            )
+    
+    @unittest.skipIf(sha_ni is None or mine_kernel is None, "needs both sha_ni and mine_kernel")
+    def test_sha_ni_matches_numba_kernel(self):
+        """Test the SHA-NI and numba searches agree across tail block layouts"""
+        for length in (10, 55, 56, 64, 120):
+            prefix = bytes(range(length))
+            self.assertEqual(
+                sha_ni.find_nonce(prefix, 2, 0, 100000),
+                mine_kernel.find_nonce(prefix, 2, 0, 100000)
+            )
+    
+    @unittest.skipIf(mine_gpu is None, "no CUDA device available")
+    def test_gpu_matches_cpu_kernel(self):
+        """Test the CUDA search returns the lowest winning nonce in its wave"""
+        prefix = bytes(range(100))
+        self.assertEqual(mine_gpu.find_nonce(prefix, 2, 0, 2048), mine_kernel.find_nonce(prefix, 2, 0, 2048))
 
 
 if __name__ == "__main__":